@@ -1,20 +1,43 @@
 import os
+import hmac
+import json
+import time
+import asyncio
 import logging
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
-from datetime import datetime
+from datetime import date, datetime
 
 import uvicorn
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request, Depends, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request, Depends, HTTPException, Header
+from fastapi.responses import HTMLResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
 
 # Import services
 from services.speech_to_text.whisper_service import WhisperService
+from services.speech_to_text.capture_service import CaptureService
+from services.speech_to_text.opus_service import OpusService
+from services.visual_context.screen_service import ScreenContextService
+from services.session.lifecycle_service import SessionLifecycleService
+from services.session.broadcast_service import BroadcastService
+from services.session.replay_service import ReplayService
 from services.ai_processing.gemini_service import GeminiService
+from services.ai_processing.ollama_service import OllamaService
+from services.ai_processing.llm_router_service import LLMRouterService
+from services.ai_processing.intent_service import IntentClassifierService, INTENT_COMMENTARY
 from services.notification.sns_service import SNSService
+from services.monitoring.loop_monitor_service import LoopMonitorService
+from services.monitoring.profiler_service import ProfilerService
+from services.archive.archive_service import ArchiveService, ARCHIVE_TABLES
+from services.scheduling.scheduler_service import (
+    FairSchedulerService,
+    JobExpiredError,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_BACKGROUND,
+)
 from models.database import init_db, get_db, SessionLocal
 from models.schemas import Session, Response, Transcript
 
@@ -36,14 +59,49 @@ templates = Jinja2Templates(directory="../frontend/templates")
 
 # Initialize services
 whisper_service = WhisperService()
+opus_service = OpusService()
+screen_service = ScreenContextService()
+capture_service = CaptureService(
+    opus_available=opus_service.available,
+    screen_enabled=screen_service.enabled
+)
 gemini_service = GeminiService()
+ollama_service = OllamaService()
+llm_router = LLMRouterService([ollama_service, gemini_service])
+intent_service = IntentClassifierService()
 sns_service = SNSService()
+session_lifecycle = SessionLifecycleService()
+replay_service = ReplayService()
+loop_monitor = LoopMonitorService()
+profiler = ProfilerService()
+archive_service = ArchiveService()
+
+# Token required by the /debug endpoints (disabled when unset)
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+# Fair schedulers for transcription and AI response jobs across sessions
+stt_scheduler = FairSchedulerService(
+    "stt",
+    max_concurrency=int(os.environ.get("STT_MAX_CONCURRENCY", 2)),
+    tenant_quota=int(os.environ.get("STT_TENANT_QUOTA", 1))
+)
+llm_scheduler = FairSchedulerService(
+    "llm",
+    max_concurrency=int(os.environ.get("LLM_MAX_CONCURRENCY", 8)),
+    tenant_quota=int(os.environ.get("LLM_TENANT_QUOTA", 2))
+)
+
+# Audio still queued after this long is dropped; its transcript would arrive too late
+STT_DEADLINE_SECONDS = float(os.environ.get("STT_DEADLINE_SECONDS", 15))
+
+# Default window for batching routine commentary into one summary response
+SUMMARY_WINDOW_SECONDS = float(os.environ.get("SUMMARY_WINDOW_SECONDS", 60))
 
-# Active WebSocket connections
-active_connections: Dict[str, WebSocket] = {}
+# Active WebSocket connections (many viewers per session)
+broadcast_service = BroadcastService()
 
-# Active sessions
-active_sessions: Dict[str, Dict] = {}
+# Active sessions (bounded and evicted by the lifecycle service)
+active_sessions: Dict[str, Dict] = session_lifecycle.sessions
 
 
 # Models
@@ -57,13 +115,29 @@ class Settings(BaseModel):
 @app.on_event("startup")
 async def startup_event():
     init_db()
+    
+    # Use an explicit default executor so its queue depth can be monitored
+    default_executor = ThreadPoolExecutor(
+        max_workers=int(os.environ.get("DEFAULT_EXECUTOR_WORKERS", 8)),
+        thread_name_prefix="default"
+    )
+    asyncio.get_event_loop().set_default_executor(default_executor)
+    loop_monitor.register_executor("default", default_executor)
+    loop_monitor.register_executor("screen-ocr", screen_service.executor)
+    loop_monitor.start()
+    
+    session_lifecycle.add_eviction_hook(on_session_evicted)
+    session_lifecycle.start()
 
 
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
-    # Close any active connections
-    pass
+    # Flush and evict remaining sessions, then release worker pools and HTTP sessions
+    await session_lifecycle.stop()
+    screen_service.close()
+    await llm_router.close()
+    await loop_monitor.stop()
 
 
 # Routes
@@ -72,83 +146,659 @@ async def get_index(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
 
+@app.get("/metrics/sessions")
+async def get_session_metrics():
+    return {**session_lifecycle.stats(), "replay": replay_service.stats()}
+
+
+@app.get("/metrics/broadcast")
+async def get_broadcast_metrics():
+    return broadcast_service.stats()
+
+
+@app.get("/metrics/llm")
+async def get_llm_metrics():
+    return {**llm_router.stats(), "intents": intent_service.stats()}
+
+
+@app.get("/metrics/scheduler")
+async def get_scheduler_metrics():
+    return {"stt": stt_scheduler.stats(), "llm": llm_scheduler.stats()}
+
+
+@app.get("/metrics/loop")
+async def get_loop_metrics():
+    return loop_monitor.stats()
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """
+    Reject requests without the admin token.
+    
+    Args:
+        x_admin_token: Value of the X-Admin-Token header
+    """
+    if not ADMIN_TOKEN or not hmac.compare_digest(x_admin_token or "", ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+@app.get("/debug/tasks", dependencies=[Depends(require_admin)])
+async def get_debug_tasks():
+    return {
+        "tasks": loop_monitor.dump_tasks(),
+        "executors": loop_monitor.executor_stats(),
+        "scheduler_queues": {
+            "stt": stt_scheduler.stats()["queued"],
+            "llm": llm_scheduler.stats()["queued"],
+        },
+        "recent_stalls": list(loop_monitor.stalls),
+    }
+
+
+@app.get("/debug/profile", dependencies=[Depends(require_admin)])
+async def get_debug_profile(seconds: float = 10.0, mode: str = "cpu", interval_ms: float = 10.0):
+    """
+    Profile the live process for a number of seconds.
+    
+    `mode=cpu` samples every thread's stack and returns collapsed stacks
+    (render with flamegraph.pl or speedscope); `mode=spans` returns time
+    spent per websocket pipeline stage.
+    """
+    if profiler.busy:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    
+    if mode == "cpu":
+        return PlainTextResponse(await profiler.profile(seconds, interval_ms))
+    if mode == "spans":
+        return await profiler.trace(seconds)
+    raise HTTPException(status_code=400, detail=f"Unknown profile mode: {mode}")
+
+
+@app.post("/admin/archive", dependencies=[Depends(require_admin)])
+async def post_archive(prune: bool = False):
+    """
+    Export finished sessions to the columnar archive, optionally pruning the hot tables.
+    """
+    loop = asyncio.get_event_loop()
+    try:
+        return await loop.run_in_executor(None, archive_service.export, SessionLocal, prune)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@app.get("/admin/archive/{table}", dependencies=[Depends(require_admin)])
+async def get_archive(table: str, start: Optional[date] = None, end: Optional[date] = None,
+                      session_id: Optional[str] = None, limit: int = 100):
+    """
+    Query archived rows from the memory-mapped columnar archive.
+    """
+    if table not in ARCHIVE_TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown archive table: {table}")
+    if not archive_service.available:
+        raise HTTPException(status_code=503, detail="pyarrow is not installed")
+    
+    loop = asyncio.get_event_loop()
+    result = await loop.run_in_executor(
+        None,
+        lambda: archive_service.query(table, start, end, session_id, limit=min(max(limit, 1), 10000))
+    )
+    return {"rows": result.to_pylist()}
+
+
+def mark_session_inactive(session_id: str):
+    """
+    Flip a session's database row to inactive.
+    
+    Args:
+        session_id: Session to mark inactive
+    """
+    db = SessionLocal()
+    try:
+        db_session = db.get(Session, session_id)
+        if db_session:
+            db_session.is_active = False
+            db.commit()
+    finally:
+        db.close()
+
+
+async def on_session_evicted(session_id: str, state: Dict):
+    """
+    Release per-session resources when the lifecycle service evicts a session.
+    
+    Args:
+        session_id: Evicted session
+        state: The session's state at eviction time
+    """
+    # The session is still registered here, so commentary waiting for the
+    # summary window can be answered and stored before the state is dropped
+    try:
+        await asyncio.wait_for(respond_to_pending(session_id), timeout=session_lifecycle.flush_timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"Timed out summarizing pending transcripts for evicted session {session_id}")
+    
+    opus_service.close_decoders(state)
+    screen_service.drop_session(session_id)
+    broadcast_service.close_session(session_id)
+    
+    loop = asyncio.get_event_loop()
+    await loop.run_in_executor(None, mark_session_inactive, session_id)
+
+
+def release_connection(session_id: Optional[str], websocket: WebSocket):
+    """
+    Unsubscribe a socket from its session and start the idle TTL if it was the last viewer.
+    
+    Args:
+        session_id: Session the socket was bound to, if any
+        websocket: The socket being released
+    """
+    if not session_id:
+        return
+    broadcast_service.unsubscribe(session_id, websocket)
+    
+    # The idle TTL only starts once the last viewer has gone
+    if session_id in active_sessions and broadcast_service.subscriber_count(session_id) == 0:
+        session_lifecycle.mark_disconnected(session_id)
+
+
+async def create_session(websocket: WebSocket, data: Dict) -> Optional[str]:
+    """
+    Create a new session, store it in the database and send its ID to the client.
+    
+    Args:
+        websocket: Connection that requested the session
+        data: The client's create/reconnect message
+        
+    Returns:
+        The new session ID, or None if the server is at session capacity
+    """
+    session_id = str(uuid.uuid4())
+    created = await session_lifecycle.create(session_id, {
+        "created_at": datetime.now(),
+        "settings": None,
+        "is_capturing": False,
+        "pending_transcripts": [],
+        "last_response_at": time.monotonic(),
+        "summary_timer": None,
+        "client_transports": data.get("transports"),
+        "capture": capture_service.negotiate(data.get("sampleRate"), data.get("transports")),
+    })
+    if not created:
+        await websocket.send_json({
+            "type": "error",
+            "error": "Server is at session capacity, please try again later"
+        })
+        return None
+    broadcast_service.subscribe(session_id, websocket)
+    
+    # Store session in database
+    db = SessionLocal()
+    try:
+        db_session = Session(
+            id=session_id,
+            created_at=datetime.now(),
+            is_active=True
+        )
+        db.add(db_session)
+        db.commit()
+    finally:
+        db.close()
+    
+    # Send session ID back to client
+    await websocket.send_json({
+        "type": "session_created",
+        "sessionId": session_id,
+        "captureParams": active_sessions[session_id]["capture"]
+    })
+    return session_id
+
+
+def renegotiate_capture(session: Dict, sample_rate: Optional[int]) -> bool:
+    """
+    Renegotiate a session's capture parameters for the client's actual sample rate.
+    
+    The adaptive chunk duration is kept as it is.
+    
+    Args:
+        session: Session state
+        sample_rate: Native sample rate reported by the client, if any
+        
+    Returns:
+        True if the capture parameters changed
+    """
+    if not sample_rate:
+        return False
+    
+    capture_params = capture_service.negotiate(sample_rate, session.get("client_transports"))
+    capture_params["chunkDurationMs"] = session["capture"]["chunkDurationMs"]
+    if capture_params == session["capture"]:
+        return False
+    session["capture"] = capture_params
+    return True
+
+
+async def traced(name: str, awaitable):
+    """
+    Await something inside a profiler span.
+    
+    Args:
+        name: Pipeline stage name
+        awaitable: Coroutine to await
+        
+    Returns:
+        The coroutine's result
+    """
+    with profiler.span(name):
+        return await awaitable
+
+
+async def log_failures(description: str, awaitable):
+    """
+    Await background work and log any exception instead of losing it with the task.
+    
+    Args:
+        description: What the work is doing (for the log message)
+        awaitable: Coroutine to await
+    """
+    try:
+        await awaitable
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.exception(f"Error {description}: {str(e)}")
+
+
+async def send_best_effort(websocket: WebSocket, message: Dict):
+    """
+    Send a message to one socket, ignoring failures if it has already gone away.
+    
+    Args:
+        websocket: Connection to send on
+        message: JSON-serializable message
+    """
+    try:
+        await websocket.send_json(message)
+    except Exception as e:
+        logger.info(f"Could not send {message.get('type')} to a closed connection: {str(e)}")
+
+
+async def process_audio_chunk(websocket: WebSocket, session_id: str, audio_data, sample_rate: int,
+                              stream_id: str = "default", seq: Optional[int] = None):
+    """
+    Run one audio chunk through transcription, AI response generation and notification.
+    
+    Args:
+        websocket: Connection that sent the audio (receives acks and capture parameter updates)
+        session_id: Session the audio belongs to
+        audio_data: 16-bit PCM samples (list or array) or float32 samples
+        sample_rate: Sample rate of the audio
+        stream_id: Audio stream the chunk belongs to
+        seq: The chunk's sequence number, claimed with `begin_audio_chunk` (None if unsequenced)
+    """
+    transcribed = expired = False
+    try:
+        # Bound the audio buffered per session
+        nbytes = getattr(audio_data, "nbytes", None) or len(audio_data) * 2
+        if not session_lifecycle.reserve_audio(session_id, nbytes):
+            return
+        
+        # Process audio with Whisper, scheduled fairly against other sessions
+        capture_service.job_started()
+        try:
+            with profiler.span("stt.total"):
+                transcript = await stt_scheduler.run(
+                    session_id,
+                    PRIORITY_INTERACTIVE,
+                    lambda: traced("stt.transcribe", whisper_service.process_audio(audio_data, sample_rate)),
+                    cost=len(audio_data) / max(sample_rate, 1),
+                    deadline=time.monotonic() + STT_DEADLINE_SECONDS
+                )
+            transcribed = True
+        except JobExpiredError:
+            # Resending cannot make a stale chunk fresh again; settle it
+            expired = True
+            logger.warning(f"Dropped stale audio chunk for session {session_id}")
+            return
+        finally:
+            capture_service.job_finished()
+            session_lifecycle.release_audio(session_id, nbytes)
+    finally:
+        # Ack only what was transcribed (or is too stale to transcribe); a
+        # chunk turned away by the buffer cap is released so its resend is processed
+        await settle_audio_chunk(websocket, session_id, stream_id, seq, transcribed, expired)
+    
+    # The session may have been evicted while transcription was running
+    if session_id not in active_sessions:
+        return
+    
+    # Reshape incoming load if the server queue depth has changed
+    capture_params = capture_service.adjust(active_sessions[session_id]["capture"])
+    if capture_params:
+        active_sessions[session_id]["capture"] = capture_params
+        # The uploading socket may have dropped; the transcript is still wanted by other viewers
+        await send_best_effort(websocket, {
+            "type": "capture_params",
+            "captureParams": capture_params
+        })
+    
+    if not transcript:
+        return
+    
+    # Store transcript in database
+    with profiler.span("db.transcript"):
+        db = SessionLocal()
+        try:
+            db_transcript = Transcript(
+                id=str(uuid.uuid4()),
+                session_id=session_id,
+                text=transcript,
+                timestamp=datetime.now()
+            )
+            db.add(db_transcript)
+            db.commit()
+            
+            # Get transcript ID
+            transcript_id = db_transcript.id
+        finally:
+            db.close()
+    
+    # Questions and action items are answered right away; routine commentary
+    # waits for the session's summary window
+    session = active_sessions[session_id]
+    session["pending_transcripts"].append((transcript_id, transcript))
+    
+    with profiler.span("classify"):
+        intent = intent_service.classify(transcript)
+    window = summary_window_seconds(session)
+    if intent != INTENT_COMMENTARY or time.monotonic() - session["last_response_at"] >= window:
+        await respond_to_pending(session_id, intent)
+    else:
+        schedule_summary(session_id, window)
+
+
+async def begin_audio_chunk(websocket: WebSocket, session_id: str, stream_id: str,
+                            seq: Optional[int]) -> bool:
+    """
+    Claim a sequenced audio chunk for processing, or drop it as a duplicate.
+    
+    Resent chunks that were already transcribed, or are being transcribed,
+    are dropped here before any decoding or inference, so each chunk is
+    transcribed exactly once. A claimed chunk must be settled with
+    `settle_audio_chunk`.
+    
+    Args:
+        websocket: Connection that sent the audio (receives the ack for duplicates)
+        session_id: Session the audio belongs to
+        stream_id: Audio stream the chunk belongs to (one per client page load)
+        seq: The chunk's sequence number (None or 0 for unsequenced clients)
+        
+    Returns:
+        True if the chunk is new and should be processed
+    """
+    session = active_sessions[session_id]
+    if replay_service.begin(session, stream_id, seq):
+        return True
+    
+    # Re-ack so the client stops resending what is already done
+    await websocket.send_json(replay_service.ack(session, stream_id))
+    return False
+
+
+async def settle_audio_chunk(websocket: WebSocket, session_id: str, stream_id: str,
+                             seq: Optional[int], processed: bool, expired: bool = False):
+    """
+    Ack a claimed audio chunk once processed, or release it and ask the client to resend it.
+    
+    Args:
+        websocket: Connection that sent the audio
+        session_id: Session the audio belongs to
+        stream_id: Audio stream the chunk belongs to
+        seq: The chunk's sequence number (None or 0 for unsequenced clients)
+        processed: Whether the chunk is done (transcribed, or there is nothing to transcribe)
+        expired: Whether the chunk's STT deadline passed; it is acked, not resent
+    """
+    session = active_sessions.get(session_id)
+    if not seq or session is None:
+        return
+    
+    if expired:
+        message = replay_service.expire(session, stream_id, seq)
+    elif processed:
+        message = replay_service.finish(session, stream_id, seq)
+    else:
+        message = replay_service.abort(session, stream_id, seq)
+    await send_best_effort(websocket, message)
+
+
+async def replay_missed_responses(websocket: WebSocket, session_id: str, last_response_id: Optional[str]):
+    """
+    Send a reconnecting client the AI responses published while it was away.
+    
+    Args:
+        websocket: The reconnected socket
+        session_id: Session it reconnected to
+        last_response_id: ID of the last response the client received, if any
+    """
+    loop = asyncio.get_event_loop()
+    missed = await loop.run_in_executor(
+        None, replay_service.missed_responses, SessionLocal, session_id, last_response_id
+    )
+    for message in missed:
+        await websocket.send_json(message)
+
+
+def submit_audio_chunk(websocket: WebSocket, session_id: str, audio_data, sample_rate: int,
+                       stream_id: str = "default", seq: Optional[int] = None):
+    """
+    Process an audio chunk in the background so the receive loop keeps reading.
+    
+    Args:
+        websocket: Connection that sent the audio
+        session_id: Session the audio belongs to
+        audio_data: 16-bit PCM samples (list or array) or float32 samples
+        sample_rate: Sample rate of the audio
+        stream_id: Audio stream the chunk belongs to
+        seq: The chunk's sequence number, claimed with `begin_audio_chunk` (None if unsequenced)
+    """
+    session_lifecycle.track_task(
+        session_id,
+        asyncio.create_task(log_failures(
+            f"processing audio for session {session_id}",
+            process_audio_chunk(websocket, session_id, audio_data, sample_rate, stream_id, seq)
+        ))
+    )
+
+
+def summary_window_seconds(session: Dict) -> float:
+    """
+    Get how long routine commentary is batched before a summary is generated.
+    
+    Args:
+        session: Session state
+        
+    Returns:
+        Summary window in seconds (the user's aiResponseFrequency setting, if set)
+    """
+    settings = session.get("settings") or {}
+    return float(settings.get("aiResponseFrequency") or SUMMARY_WINDOW_SECONDS)
+
+
+def schedule_summary(session_id: str, window: float):
+    """
+    Make sure pending commentary is summarized when the window closes, even if no more audio arrives.
+    
+    Args:
+        session_id: Session with pending commentary
+        window: Summary window in seconds
+    """
+    session = active_sessions.get(session_id)
+    if not session or session.get("summary_timer"):
+        return
+    
+    delay = max(session["last_response_at"] + window - time.monotonic(), 0.0)
+    session["summary_timer"] = asyncio.get_event_loop().call_later(delay, flush_summary, session_id)
+
+
+def flush_summary(session_id: str):
+    """
+    Summary timer callback: summarize whatever commentary is pending.
+    
+    Args:
+        session_id: Session whose summary window closed
+    """
+    session = active_sessions.get(session_id)
+    if not session:
+        return
+    session["summary_timer"] = None
+    session_lifecycle.track_task(session_id, asyncio.create_task(log_failures(
+        f"summarizing session {session_id}", respond_to_pending(session_id)
+    )))
+
+
+async def respond_to_pending(session_id: str, intent: str = INTENT_COMMENTARY):
+    """
+    Generate one AI response covering every transcript pending for a session.
+    
+    Args:
+        session_id: Session to respond for
+        intent: Intent of the latest transcript, used to focus the prompt
+    """
+    session = active_sessions.get(session_id)
+    if not session:
+        return
+    
+    # This response covers everything pending, so the summary timer is no longer needed
+    timer = session.get("summary_timer")
+    if timer:
+        timer.cancel()
+        session["summary_timer"] = None
+    
+    if not session["pending_transcripts"]:
+        return
+    
+    pending = session["pending_transcripts"]
+    session["pending_transcripts"] = []
+    session["last_response_at"] = time.monotonic()
+    transcript_id = pending[-1][0]
+    transcript = " ".join(text for _, text in pending)
+    
+    # Generate AI response; detected questions and action items jump the queue
+    screen_context = screen_service.get_context(session_id)
+    focus = None if intent == INTENT_COMMENTARY else intent
+    with profiler.span("llm.total"):
+        ai_response = await llm_scheduler.run(
+            session_id,
+            PRIORITY_BACKGROUND if focus is None else PRIORITY_INTERACTIVE,
+            lambda: traced("llm.generate", llm_router.generate_response(transcript, screen_context, focus))
+        )
+    
+    if not ai_response:
+        return
+    
+    # Store response in database; its ID lets reconnecting clients resume after it
+    response_id = str(uuid.uuid4())
+    responded_at = datetime.now()
+    with profiler.span("db.response"):
+        db = SessionLocal()
+        try:
+            db_response = Response(
+                id=response_id,
+                session_id=session_id,
+                transcript_id=transcript_id,
+                text=ai_response,
+                timestamp=responded_at
+            )
+            db.add(db_response)
+            db.commit()
+        finally:
+            db.close()
+    
+    # Send response to every viewer of the session
+    with profiler.span("broadcast"):
+        broadcast_service.publish(session_id, {
+            "type": "ai_response",
+            "responseId": response_id,
+            "response": ai_response,
+            "timestamp": responded_at.isoformat()
+        })
+    
+    # Send notification if enabled
+    settings = session.get("settings")
+    if settings and settings.get("sendMobileNotifications") and settings.get("phoneNumber"):
+        # boto3 is blocking; keep it off the event loop
+        loop = asyncio.get_event_loop()
+        await traced("notify", loop.run_in_executor(
+            None,
+            lambda: sns_service.send_notification(
+                phone_number=settings["phoneNumber"],
+                message=f"Meeting Assistant: {ai_response}"
+            )
+        ))
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
     session_id = None
     
+    # Audio sequence numbers are scoped to the client's stream (one per page load)
+    stream_id = "default"
+    
     try:
         while True:
-            # Receive message from client
-            data = await websocket.receive_json()
+            # Receive message from client (JSON text or binary audio frame)
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            
+            with profiler.span("parse"):
+                if message.get("bytes") is not None:
+                    data = capture_service.parse_binary_frame(message["bytes"])
+                else:
+                    data = json.loads(message["text"])
+            if data is None:
+                await websocket.send_json({
+                    "type": "error",
+                    "error": "Malformed binary frame"
+                })
+                continue
             message_type = data.get("type")
             
+            if session_id:
+                session_lifecycle.touch(session_id)
+            
             # Handle different message types
             if message_type == "create_session":
                 # Create new session
-                session_id = str(uuid.uuid4())
-                active_connections[session_id] = websocket
-                active_sessions[session_id] = {
-                    "created_at": datetime.now(),
-                    "settings": None,
-                    "is_capturing": False,
-                }
-                
-                # Store session in database
-                db = SessionLocal()
-                try:
-                    db_session = Session(
-                        id=session_id,
-                        created_at=datetime.now(),
-                        is_active=True
-                    )
-                    db.add(db_session)
-                    db.commit()
-                finally:
-                    db.close()
-                
-                # Send session ID back to client
-                await websocket.send_json({
-                    "type": "session_created",
-                    "sessionId": session_id
-                })
+                release_connection(session_id, websocket)
+                stream_id = data.get("streamId") or "default"
+                session_id = await create_session(websocket, data)
                 
             elif message_type == "reconnect_session":
                 # Reconnect to existing session
+                release_connection(session_id, websocket)
+                stream_id = data.get("streamId") or "default"
                 session_id = data.get("sessionId")
-                if session_id in active_sessions:
-                    active_connections[session_id] = websocket
+                if session_id in active_sessions and not active_sessions[session_id].get("evicting"):
+                    broadcast_service.subscribe(session_id, websocket)
+                    session_lifecycle.mark_connected(session_id)
+                    if data.get("transports"):
+                        active_sessions[session_id]["client_transports"] = data["transports"]
+                    renegotiate_capture(active_sessions[session_id], data.get("sampleRate"))
                     await websocket.send_json({
                         "type": "session_reconnected",
-                        "sessionId": session_id
+                        "sessionId": session_id,
+                        "captureParams": active_sessions[session_id]["capture"],
+                        "audioAck": replay_service.tracker(active_sessions[session_id], stream_id).high_water
                     })
-                else:
-                    # Session not found, create new one
-                    session_id = str(uuid.uuid4())
-                    active_connections[session_id] = websocket
-                    active_sessions[session_id] = {
-                        "created_at": datetime.now(),
-                        "settings": None,
-                        "is_capturing": False,
-                    }
-                    
-                    # Store session in database
-                    db = SessionLocal()
-                    try:
-                        db_session = Session(
-                            id=session_id,
-                            created_at=datetime.now(),
-                            is_active=True
-                        )
-                        db.add(db_session)
-                        db.commit()
-                    finally:
-                        db.close()
                     
-                    await websocket.send_json({
-                        "type": "session_created",
-                        "sessionId": session_id
-                    })
+                    # Subscribed first, so nothing published from here on is missed;
+                    # the client drops anything it receives twice by response ID
+                    await replay_missed_responses(websocket, session_id, data.get("lastResponseId"))
+                else:
+                    # Session not found (or evicted), create new one
+                    session_id = await create_session(websocket, data)
             
             elif message_type == "update_settings":
                 # Update session settings
@@ -161,7 +811,10 @@ async def websocket_endpoint(websocket: WebSocket):
                     
                     # Update phone number for SNS if needed
                     if settings.get("sendMobileNotifications") and settings.get("phoneNumber"):
-                        sns_service.register_phone_number(settings["phoneNumber"])
+                        loop = asyncio.get_event_loop()
+                        await loop.run_in_executor(
+                            None, sns_service.register_phone_number, settings["phoneNumber"]
+                        )
                 
             elif message_type == "capture_started":
                 # Mark session as capturing
@@ -169,7 +822,15 @@ async def websocket_endpoint(websocket: WebSocket):
                     session_id = data.get("sessionId")
                 
                 if session_id in active_sessions:
-                    active_sessions[session_id]["is_capturing"] = True
+                    session = active_sessions[session_id]
+                    session["is_capturing"] = True
+                    
+                    # The real capture rate is only known once the AudioContext exists
+                    if renegotiate_capture(session, data.get("sampleRate")):
+                        await websocket.send_json({
+                            "type": "capture_params",
+                            "captureParams": session["capture"]
+                        })
             
             elif message_type == "capture_stopped":
                 # Mark session as not capturing
@@ -178,73 +839,88 @@ async def websocket_endpoint(websocket: WebSocket):
                 
                 if session_id in active_sessions:
                     active_sessions[session_id]["is_capturing"] = False
+                    
+                    # Summarize whatever commentary is still waiting for the window
+                    session_lifecycle.track_task(
+                        session_id,
+                        asyncio.create_task(log_failures(
+                            f"summarizing session {session_id}", respond_to_pending(session_id)
+                        ))
+                    )
             
             elif message_type == "audio_data":
-                # Process audio data
+                # Process audio data sent as a JSON sample list
                 if not session_id:
                     session_id = data.get("sessionId")
                 
-                if session_id in active_sessions and active_sessions[session_id]["is_capturing"]:
-                    audio_data = data.get("data")
-                    sample_rate = data.get("sampleRate", 44100)
-                    
-                    # Process audio with Whisper
-                    transcript = await whisper_service.process_audio(audio_data, sample_rate)
+                if (session_id in active_sessions and active_sessions[session_id]["is_capturing"]
+                        and data.get("data")
+                        and await begin_audio_chunk(websocket, session_id, stream_id, data.get("seq"))):
+                    submit_audio_chunk(
+                        websocket,
+                        session_id,
+                        data.get("data"),
+                        data.get("sampleRate", 44100),
+                        stream_id,
+                        data.get("seq")
+                    )
+            
+            elif message_type == "audio_pcm":
+                # Process binary 16-bit PCM frame
+                if (session_id in active_sessions and active_sessions[session_id]["is_capturing"]
+                        and await begin_audio_chunk(websocket, session_id, stream_id, data["seq"])):
+                    submit_audio_chunk(
+                        websocket, session_id, data["samples"], data["sampleRate"], stream_id, data["seq"]
+                    )
+            
+            elif message_type == "audio_opus":
+                # Decode binary Opus frame with the session's streaming decoder; duplicates
+                # are dropped first so they never advance the decoder state
+                if (session_id in active_sessions and active_sessions[session_id]["is_capturing"]
+                        and await begin_audio_chunk(websocket, session_id, stream_id, data["seq"])):
+                    session = active_sessions[session_id]
+                    decoder = opus_service.stream_decoder(
+                        session, stream_id, data["sampleRate"], replay_service.max_streams
+                    )
                     
-                    if transcript:
-                        # Store transcript in database
-                        db = SessionLocal()
+                    if decoder is None:
+                        # Resending cannot help; settle the chunk so it is not retried
+                        await settle_audio_chunk(websocket, session_id, stream_id, data["seq"], True)
+                        await websocket.send_json({
+                            "type": "error",
+                            "error": "Opus transport is not available"
+                        })
+                    else:
                         try:
-                            db_transcript = Transcript(
-                                session_id=session_id,
-                                text=transcript,
-                                timestamp=datetime.now()
-                            )
-                            db.add(db_transcript)
-                            db.commit()
-                            
-                            # Get transcript ID
-                            transcript_id = db_transcript.id
-                        finally:
-                            db.close()
+                            packets = opus_service.unpack_packets(data["payload"])
+                            with profiler.span("opus.decode"):
+                                samples, sample_rate = decoder.decode(packets)
+                        except Exception as e:
+                            # The decoder state is suspect now; start the stream's next
+                            # chunk on a fresh one. A resend would fail the same way, so
+                            # settle the chunk rather than leave its seq claimed
+                            logger.error(f"Error decoding Opus audio for session {session_id}: {str(e)}")
+                            opus_service.drop_decoder(session, stream_id)
+                            samples = []
                         
-                        # Generate AI response
-                        ai_response = await gemini_service.generate_response(transcript)
-                        
-                        if ai_response:
-                            # Store response in database
-                            db = SessionLocal()
-                            try:
-                                db_response = Response(
-                                    session_id=session_id,
-                                    transcript_id=transcript_id,
-                                    text=ai_response,
-                                    timestamp=datetime.now()
-                                )
-                                db.add(db_response)
-                                db.commit()
-                            finally:
-                                db.close()
-                            
-                            # Send response to client
-                            await websocket.send_json({
-                                "type": "ai_response",
-                                "response": ai_response,
-                                "timestamp": datetime.now().isoformat()
-                            })
-                            
-                            # Send notification if enabled
-                            settings = active_sessions[session_id].get("settings")
-                            if settings and settings.get("sendMobileNotifications") and settings.get("phoneNumber"):
-                                sns_service.send_notification(
-                                    phone_number=settings["phoneNumber"],
-                                    message=f"Meeting Assistant: {ai_response}"
-                                )
+                        if len(samples) > 0:
+                            submit_audio_chunk(
+                                websocket, session_id, samples, sample_rate, stream_id, data["seq"]
+                            )
+                        else:
+                            await settle_audio_chunk(websocket, session_id, stream_id, data["seq"], True)
+            
+            elif message_type == "screen_frame":
+                # Extract visual context in the background so audio is never held up
+                if session_id in active_sessions and active_sessions[session_id]["is_capturing"]:
+                    session_lifecycle.track_task(
+                        session_id,
+                        asyncio.create_task(screen_service.process_frame(session_id, data["payload"]))
+                    )
             
             elif message_type == "screen_capture":
-                # Process screen capture data
-                # This is a placeholder - in a real implementation, you might
-                # want to save screenshots or process them for visual context
+                # Legacy base64 WebM upload; frames are now negotiated as binary
+                # stills via captureParams.screenCapture, so ignore the payload
                 pass
             
             else:
@@ -256,15 +932,14 @@ async def websocket_endpoint(websocket: WebSocket):
     
     except WebSocketDisconnect:
         # Handle disconnection
-        if session_id and session_id in active_connections:
-            del active_connections[session_id]
-            logger.info(f"Client disconnected: {session_id}")
+        logger.info(f"Client disconnected: {session_id}")
     
     except Exception as e:
         # Handle other exceptions
         logger.error(f"WebSocket error: {str(e)}")
-        if session_id and session_id in active_connections:
-            del active_connections[session_id]
+    
+    finally:
+        release_connection(session_id, websocket)
 
 
 # Run the application
@@ -44,4 +44,25 @@ else:
             db.close()
     
     def init_db():
-        Base.metadata.create_all(bind=engine)
\ No newline at end of file
+        Base.metadata.create_all(bind=engine)
+        migrate_db()
+    
+    def migrate_db():
+        # create_all only creates missing tables; add columns introduced after
+        # a table was first created so existing databases keep working
+        from sqlalchemy import inspect, text
+        from sqlalchemy.types import DateTime
+        
+        inspector = inspect(engine)
+        if "sessions" not in inspector.get_table_names():
+            return
+        columns = {column["name"] for column in inspector.get_columns("sessions")}
+        if "archived_at" in columns:
+            return
+        
+        column_type = DateTime().compile(dialect=engine.dialect)
+        with engine.begin() as connection:
+            connection.execute(text(f"ALTER TABLE sessions ADD COLUMN archived_at {column_type}"))
+            for index in Base.metadata.tables["sessions"].indexes:
+                if "archived_at" in index.columns:
+                    index.create(bind=connection, checkfirst=True)
\ No newline at end of file
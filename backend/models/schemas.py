@@ -15,6 +15,7 @@ try:
         id = Column(String, primary_key=True, index=True)
         created_at = Column(DateTime, default=datetime.now)
         is_active = Column(Boolean, default=True)
+        archived_at = Column(DateTime, nullable=True, index=True)
         
         transcripts = relationship("Transcript", back_populates="session")
         responses = relationship("Response", back_populates="session")
@@ -50,6 +51,7 @@ except (NameError, ImportError):
         id: str
         created_at: datetime
         is_active: bool = True
+        archived_at: Optional[datetime] = None
     
     
     class Session(SessionBase):
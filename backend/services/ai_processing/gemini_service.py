@@ -1,25 +1,37 @@
 import os
 import logging
 import asyncio
-import json
-from typing import Optional
 import aiohttp
 
+from services.ai_processing.llm_provider import LLMProvider, LLMProviderError
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class GeminiService:
+class GeminiService(LLMProvider):
     """
     Service for generating AI responses using Google's Gemini API.
     """
     
+    name = "gemini"
+    
     def __init__(self):
         """
         Initialize the Gemini service.
         """
+        super().__init__(
+            overhead_ms=float(os.environ.get("GEMINI_OVERHEAD_MS", 800)),
+            ms_per_kchar=float(os.environ.get("GEMINI_MS_PER_KCHAR", 200)),
+            cost_per_kchar=float(os.environ.get("GEMINI_COST_PER_KCHAR", 0.0005)),
+            max_concurrency=int(os.environ.get("GEMINI_MAX_CONCURRENCY", 16)),
+        )
         self.api_key = os.environ.get("GEMINI_API_KEY")
-        self.api_url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent"
+        self.api_url = os.environ.get(
+            "GEMINI_API_URL",
+            "https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent"
+        )
+        self.timeout = aiohttp.ClientTimeout(total=float(os.environ.get("GEMINI_TIMEOUT", 30)))
         self.session = None
         self.lock = asyncio.Lock()
         
@@ -27,55 +39,61 @@ class GeminiService:
         if not self.api_key:
             logger.warning("GEMINI_API_KEY environment variable not set. Gemini service will not work.")
     
+    @property
+    def available(self) -> bool:
+        """
+        Whether an API key is configured.
+        """
+        return bool(self.api_key)
+    
     async def initialize(self):
         """
         Initialize the aiohttp session.
         """
         if self.session is None:
-            self.session = aiohttp.ClientSession()
+            self.session = aiohttp.ClientSession(timeout=self.timeout)
     
-    async def generate_response(self, transcript: str) -> Optional[str]:
+    async def complete(self, prompt: str) -> str:
         """
-        Generate an AI response based on meeting transcript.
+        Send a prompt to the Gemini API.
         
         Args:
-            transcript: The meeting transcript text
+            prompt: The full prompt
             
         Returns:
-            AI-generated response or None if generation failed
+            Completion text
+            
+        Raises:
+            LLMProviderError: If the request failed or was throttled
         """
         if not self.api_key:
-            logger.error("Cannot generate response: GEMINI_API_KEY not set")
-            return None
+            raise LLMProviderError("GEMINI_API_KEY not set")
         
-        try:
-            # Initialize session if not already done
-            await self.initialize()
-            
-            # Prepare prompt for Gemini
-            prompt = self._create_prompt(transcript)
-            
-            # Prepare request payload
-            payload = {
-                "contents": [
-                    {
-                        "parts": [
-                            {
-                                "text": prompt
-                            }
-                        ]
-                    }
-                ],
-                "generationConfig": {
-                    "temperature": 0.7,
-                    "topK": 40,
-                    "topP": 0.95,
-                    "maxOutputTokens": 1024,
+        # Initialize session if not already done
+        await self.initialize()
+        
+        # Prepare request payload
+        payload = {
+            "contents": [
+                {
+                    "parts": [
+                        {
+                            "text": prompt
+                        }
+                    ]
                 }
+            ],
+            "generationConfig": {
+                "temperature": 0.7,
+                "topK": 40,
+                "topP": 0.95,
+                "maxOutputTokens": 1024,
             }
-            
-            # Make API request
-            url = f"{self.api_url}?key={self.api_key}"
+        }
+        
+        # Make API request
+        url = f"{self.api_url}?key={self.api_key}"
+        try:
             async with self.session.post(url, json=payload) as response:
                 if response.status == 200:
                     result = await response.json()
@@ -86,43 +104,15 @@ class GeminiService:
                         logger.info(f"Generated AI response: {response_text[:50]}...")
                         return response_text
                     except (KeyError, IndexError) as e:
-                        logger.error(f"Error extracting response from Gemini API result: {str(e)}")
-                        return None
+                        raise LLMProviderError(f"Error extracting response from Gemini API result: {str(e)}")
                 else:
                     error_text = await response.text()
-                    logger.error(f"Gemini API error (status {response.status}): {error_text}")
-                    return None
-                
-        except Exception as e:
-            logger.error(f"Error in AI response generation: {str(e)}")
-            return None
-    
-    def _create_prompt(self, transcript: str) -> str:
-        """
-        Create an effective prompt for Gemini based on the meeting transcript.
-        
-        Args:
-            transcript: The meeting transcript text
-            
-        Returns:
-            Formatted prompt for Gemini
-        """
-        return f"""
-You are an AI Meeting Assistant that helps participants by providing helpful insights, summaries, and action items during meetings.
-
-Below is a transcript from a portion of an ongoing meeting. Based on this transcript, provide:
-1. A brief summary of the key points discussed (if applicable)
-2. Any important questions that were raised
-3. Action items that participants should follow up on
-4. Any helpful resources or information related to the topics discussed
-
-Keep your response concise, professional, and focused on the most valuable information.
-
-Meeting Transcript:
-{transcript}
-
-Your response:
-"""
+                    raise LLMProviderError(
+                        f"Gemini API error (status {response.status}): {error_text}",
+                        throttled=response.status in (429, 503)
+                    )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise LLMProviderError(f"Gemini request failed: {str(e)}")
     
     async def close(self):
         """
@@ -0,0 +1,111 @@
+import re
+import logging
+from typing import Dict
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Intent labels
+INTENT_QUESTION = "question"
+INTENT_ACTION_ITEM = "action_item"
+INTENT_COMMENTARY = "commentary"
+
+QUESTION_WORDS = (
+    "what", "why", "how", "when", "where", "who", "whom", "whose", "which",
+    "can", "could", "would", "should", "shall", "will", "do", "does", "did",
+    "is", "are", "was", "were", "have", "has", "may", "might",
+)
+
+QUESTION_PHRASES = re.compile(
+    r"\b(any questions|does anyone know|do you know|i wonder|i'm wondering|"
+    r"can someone|could someone|what about|how about|is there a way)\b",
+    re.IGNORECASE,
+)
+
+# Verbs that turn "I'll ..."/"we need to ..." from filler into a commitment
+TASK_VERBS = (
+    r"(send|share|email|forward|follow up|review|update|schedule|set up|book|prepare|draft|"
+    r"write up|look into|reach out|circle back|fix|investigate|file|assign)"
+)
+
+ACTION_PHRASES = re.compile(
+    r"\b(action items?|to-?do (list|item)|the deadline (is|for)|due (by|on)|assign(ed)? to|"
+    r"(i'll|i will|we'll|we will|you'll|need to|needs to|please|let's)( also| go ahead and)? "
+    + TASK_VERBS + r")\b",
+    re.IGNORECASE,
+)
+
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+
+class IntentClassifierService:
+    """
+    Service for cheaply classifying partial transcripts.
+
+    Rule-based, so it runs inline on every transcript chunk. Questions and
+    action items trigger an immediate, high-priority AI response; routine
+    commentary is batched into the periodic summary instead.
+    """
+
+    def __init__(self):
+        """
+        Initialize the classifier.
+        """
+        self.counts: Dict[str, int] = {
+            INTENT_QUESTION: 0,
+            INTENT_ACTION_ITEM: 0,
+            INTENT_COMMENTARY: 0,
+        }
+
+    def classify(self, text: str) -> str:
+        """
+        Classify a transcript chunk.
+
+        Args:
+            text: Transcript text
+
+        Returns:
+            One of "question", "action_item" or "commentary"
+        """
+        intent = INTENT_COMMENTARY
+        for sentence in SENTENCE_SPLIT.split(text.strip()):
+            if self._is_question(sentence):
+                intent = INTENT_QUESTION
+                break
+            if ACTION_PHRASES.search(sentence):
+                intent = INTENT_ACTION_ITEM
+
+        self.counts[intent] += 1
+        return intent
+
+    @staticmethod
+    def _is_question(sentence: str) -> bool:
+        """
+        Check whether a sentence looks like a question.
+
+        Args:
+            sentence: A single sentence
+
+        Returns:
+            True if the sentence is likely a question
+        """
+        sentence = sentence.strip()
+        if not sentence:
+            return False
+        if sentence.endswith("?"):
+            return True
+
+        first_word = sentence.split(None, 1)[0].lower().strip(",.!")
+        # Whisper often drops the question mark on short spoken questions
+        if first_word in QUESTION_WORDS and len(sentence.split()) <= 15 and not sentence.endswith("."):
+            return True
+        return bool(QUESTION_PHRASES.search(sentence))
+
+    def stats(self) -> Dict:
+        """
+        Get classification counts.
+
+        Returns:
+            Dictionary of counts per intent
+        """
+        return dict(self.counts)
@@ -0,0 +1,279 @@
+import os
+import time
+import logging
+from typing import Dict, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class LLMProviderError(Exception):
+    """
+    Raised by a provider when a completion request fails.
+    """
+
+    def __init__(self, message: str, throttled: bool = False):
+        """
+        Initialize the error.
+
+        Args:
+            message: Description of the failure
+            throttled: Whether the backend rejected the request for rate/capacity reasons
+        """
+        super().__init__(message)
+        self.throttled = throttled
+
+
+class LLMProvider:
+    """
+    Base class for LLM backends used to generate meeting assistant responses.
+
+    Subclasses implement `complete`. The base class builds the prompt and
+    keeps the latency model, in-flight count and failure cooldown that the
+    router uses to choose a backend.
+    """
+
+    name = "llm"
+
+    def __init__(self, overhead_ms: float, ms_per_kchar: float, cost_per_kchar: float,
+                 max_concurrency: int):
+        """
+        Initialize the provider's routing statistics.
+
+        Args:
+            overhead_ms: Prior fixed latency per request (network round-trip, queueing)
+            ms_per_kchar: Prior latency per 1000 prompt characters
+            cost_per_kchar: Cost per 1000 prompt characters
+            max_concurrency: Number of concurrent requests before the backend is considered saturated
+        """
+        self.overhead_ms = overhead_ms
+        self.prior_ms_per_kchar = ms_per_kchar
+        self.ms_per_kchar = ms_per_kchar
+        self.cost_per_kchar = cost_per_kchar
+        self.max_concurrency = max(max_concurrency, 1)
+        self.ewma_alpha = 0.2
+
+        # Without fresh observations the estimate decays back toward the prior,
+        # so one slow request (e.g. a cold model load) cannot exclude a backend
+        # from routing forever
+        self.estimate_half_life = float(os.environ.get("LLM_ESTIMATE_HALF_LIFE_SECONDS", 300))
+        self.observed_at = time.monotonic()
+
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+        self.consecutive_failures = 0
+        self.requests = 0
+        self.failures = 0
+        self.throttles = 0
+
+    @property
+    def available(self) -> bool:
+        """
+        Whether the provider is configured well enough to be used at all.
+        """
+        return True
+
+    async def complete(self, prompt: str) -> str:
+        """
+        Send a prompt to the backend and return the completion text.
+
+        Args:
+            prompt: The full prompt
+
+        Returns:
+            Completion text
+
+        Raises:
+            LLMProviderError: If the request failed or was throttled
+        """
+        raise NotImplementedError
+
+    async def generate_response(self, transcript: str, screen_context: Optional[str] = None,
+                                intent: Optional[str] = None) -> Optional[str]:
+        """
+        Generate an AI response based on meeting transcript.
+
+        Args:
+            transcript: The meeting transcript text
+            screen_context: Text extracted from the shared screen, if any
+            intent: Detected intent of the latest transcript ("question", "action_item"), if any
+
+        Returns:
+            AI-generated response or None if generation failed
+        """
+        try:
+            return await self.timed_complete(self._create_prompt(transcript, screen_context, intent))
+        except LLMProviderError as e:
+            logger.error(f"Error in AI response generation ({self.name}): {str(e)}")
+            return None
+
+    async def timed_complete(self, prompt: str) -> str:
+        """
+        Run `complete` while updating the in-flight count, latency model and cooldown.
+
+        Args:
+            prompt: The full prompt
+
+        Returns:
+            Completion text
+
+        Raises:
+            LLMProviderError: If the request failed or was throttled
+        """
+        self.in_flight += 1
+        self.requests += 1
+        started = time.monotonic()
+        try:
+            text = await self.complete(prompt)
+        except LLMProviderError as e:
+            self._record_failure(e.throttled)
+            raise
+        except Exception as e:
+            self._record_failure(False)
+            raise LLMProviderError(str(e)) from e
+        finally:
+            self.in_flight -= 1
+
+        self._record_latency((time.monotonic() - started) * 1000.0, len(prompt))
+        self.consecutive_failures = 0
+        return text
+
+    def estimate_latency_ms(self, prompt_chars: int) -> float:
+        """
+        Estimate how long a prompt would take on this backend right now.
+
+        Args:
+            prompt_chars: Length of the prompt in characters
+
+        Returns:
+            Estimated latency in milliseconds, inflated by current queue depth
+        """
+        base = self.overhead_ms + self.current_ms_per_kchar() * prompt_chars / 1000.0
+        return base * (1.0 + self.in_flight / self.max_concurrency)
+
+    def current_ms_per_kchar(self) -> float:
+        """
+        Get the per-character latency estimate, decayed toward the prior by its age.
+
+        Returns:
+            Estimated milliseconds per 1000 prompt characters
+        """
+        if self.estimate_half_life <= 0:
+            return self.ms_per_kchar
+        age = time.monotonic() - self.observed_at
+        weight = 0.5 ** (age / self.estimate_half_life)
+        return self.prior_ms_per_kchar + weight * (self.ms_per_kchar - self.prior_ms_per_kchar)
+
+    def estimate_cost(self, prompt_chars: int) -> float:
+        """
+        Estimate the cost of a prompt on this backend.
+
+        Args:
+            prompt_chars: Length of the prompt in characters
+
+        Returns:
+            Estimated cost
+        """
+        return self.cost_per_kchar * prompt_chars / 1000.0
+
+    def is_healthy(self) -> bool:
+        """
+        Whether the provider is available and not cooling down after failures.
+        """
+        return self.available and time.monotonic() >= self.cooldown_until
+
+    def _record_latency(self, latency_ms: float, prompt_chars: int):
+        """
+        Fold an observed latency into the per-character latency estimate.
+
+        Args:
+            latency_ms: Observed request latency
+            prompt_chars: Length of the prompt in characters
+        """
+        kchars = max(prompt_chars / 1000.0, 0.1)
+        observed_rate = max(latency_ms - self.overhead_ms, 0.0) / kchars
+        current = self.current_ms_per_kchar()
+        self.ms_per_kchar = current + self.ewma_alpha * (observed_rate - current)
+        self.observed_at = time.monotonic()
+
+    def _record_failure(self, throttled: bool):
+        """
+        Put the provider into an exponentially growing cooldown after a failure.
+
+        Args:
+            throttled: Whether the failure was a throttle/capacity rejection
+        """
+        self.failures += 1
+        if throttled:
+            self.throttles += 1
+        self.consecutive_failures += 1
+
+        base = 5.0 if throttled else 2.0
+        cooldown = min(base * (2 ** (self.consecutive_failures - 1)), 120.0)
+        self.cooldown_until = time.monotonic() + cooldown
+        logger.warning(f"LLM provider {self.name} cooling down for {cooldown:.0f}s")
+
+    def stats(self) -> Dict:
+        """
+        Get routing statistics for this provider.
+
+        Returns:
+            Dictionary of statistics
+        """
+        return {
+            "available": self.available,
+            "healthy": self.is_healthy(),
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "ms_per_kchar": round(self.current_ms_per_kchar(), 1),
+            "requests": self.requests,
+            "failures": self.failures,
+            "throttles": self.throttles,
+        }
+
+    def _create_prompt(self, transcript: str, screen_context: Optional[str] = None,
+                       intent: Optional[str] = None) -> str:
+        """
+        Create an effective prompt based on the meeting transcript.
+
+        Args:
+            transcript: The meeting transcript text
+            screen_context: Text extracted from the shared screen, if any
+            intent: Detected intent of the latest transcript ("question", "action_item"), if any
+
+        Returns:
+            Formatted prompt
+        """
+        screen_section = ""
+        if screen_context:
+            screen_section = f"""
+Text currently shown on the shared screen (from OCR, may contain errors):
+{screen_context}
+"""
+
+        focus_section = ""
+        if intent == "question":
+            focus_section = """
+The end of the transcript contains a question. Answer it first, directly and briefly, before anything else.
+"""
+        elif intent == "action_item":
+            focus_section = """
+The end of the transcript contains an action item. Restate it first with its owner and deadline, if mentioned.
+"""
+
+        return f"""
+You are an AI Meeting Assistant that helps participants by providing helpful insights, summaries, and action items during meetings.
+
+Below is a transcript from a portion of an ongoing meeting. Based on this transcript, provide:
+1. A brief summary of the key points discussed (if applicable)
+2. Any important questions that were raised
+3. Action items that participants should follow up on
+4. Any helpful resources or information related to the topics discussed
+
+Keep your response concise, professional, and focused on the most valuable information.
+{focus_section}{screen_section}
+Meeting Transcript:
+{transcript}
+
+Your response:
+"""
@@ -0,0 +1,110 @@
+import os
+import logging
+from typing import Dict, List, Optional
+
+from services.ai_processing.llm_provider import LLMProvider, LLMProviderError
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class LLMRouterService:
+    """
+    Service for routing AI response requests across LLM backends.
+
+    Each request goes to the cheapest healthy backend whose estimated latency
+    (from prompt size and current queue depth) meets the latency SLO, or to
+    the fastest backend if none does. If a backend errors or is throttled it
+    is put into cooldown and the request fails over to the next candidate.
+    """
+
+    def __init__(self, providers: List[LLMProvider]):
+        """
+        Initialize the router.
+
+        Args:
+            providers: Candidate backends
+        """
+        self.providers = providers
+        self.latency_slo_ms = float(os.environ.get("LLM_LATENCY_SLO_MS", 3000))
+        self.failovers = 0
+        self.exhausted = 0
+
+    def rank(self, prompt_chars: int) -> List[LLMProvider]:
+        """
+        Order backends by preference for a prompt.
+
+        Args:
+            prompt_chars: Length of the prompt in characters
+
+        Returns:
+            Healthy backends, best first; unhealthy-but-available backends are
+            appended as a last resort
+        """
+        healthy = [p for p in self.providers if p.is_healthy()]
+        within_slo = [p for p in healthy if p.estimate_latency_ms(prompt_chars) <= self.latency_slo_ms]
+        over_slo = [p for p in healthy if p not in within_slo]
+
+        ranked = sorted(
+            within_slo,
+            key=lambda p: (p.estimate_cost(prompt_chars), p.estimate_latency_ms(prompt_chars))
+        )
+        ranked += sorted(over_slo, key=lambda p: p.estimate_latency_ms(prompt_chars))
+        ranked += [p for p in self.providers if p.available and p not in healthy]
+        return ranked
+
+    async def generate_response(self, transcript: str, screen_context: Optional[str] = None,
+                                intent: Optional[str] = None) -> Optional[str]:
+        """
+        Generate an AI response based on meeting transcript, failing over between backends.
+
+        Args:
+            transcript: The meeting transcript text
+            screen_context: Text extracted from the shared screen, if any
+            intent: Detected intent of the latest transcript ("question", "action_item"), if any
+
+        Returns:
+            AI-generated response or None if every backend failed
+        """
+        if not self.providers:
+            logger.error("Cannot generate response: no LLM providers configured")
+            return None
+
+        prompt = self.providers[0]._create_prompt(transcript, screen_context, intent)
+        candidates = self.rank(len(prompt))
+
+        for attempt, provider in enumerate(candidates):
+            if attempt > 0:
+                self.failovers += 1
+                logger.info(f"Failing over to LLM provider {provider.name}")
+            try:
+                return await provider.timed_complete(prompt)
+            except LLMProviderError as e:
+                logger.error(f"LLM provider {provider.name} failed: {str(e)}")
+
+        self.exhausted += 1
+        logger.error("All LLM providers failed to generate a response")
+        return None
+
+    async def close(self):
+        """
+        Close every backend's HTTP session.
+        """
+        for provider in self.providers:
+            close = getattr(provider, "close", None)
+            if close:
+                await close()
+
+    def stats(self) -> Dict:
+        """
+        Get routing statistics.
+
+        Returns:
+            Dictionary of per-provider and router statistics
+        """
+        return {
+            "latency_slo_ms": self.latency_slo_ms,
+            "failovers": self.failovers,
+            "exhausted": self.exhausted,
+            "providers": {p.name: p.stats() for p in self.providers},
+        }
@@ -0,0 +1,103 @@
+import os
+import logging
+import asyncio
+import aiohttp
+
+from services.ai_processing.llm_provider import LLMProvider, LLMProviderError
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class OllamaService(LLMProvider):
+    """
+    Service for generating AI responses with a local Ollama server.
+
+    Local inference has no WAN round-trip and no per-request cost, but is
+    slower per token and has little concurrency, which the router accounts for.
+    """
+
+    name = "ollama"
+
+    def __init__(self):
+        """
+        Initialize the Ollama service.
+        """
+        super().__init__(
+            overhead_ms=float(os.environ.get("OLLAMA_OVERHEAD_MS", 50)),
+            ms_per_kchar=float(os.environ.get("OLLAMA_MS_PER_KCHAR", 1500)),
+            cost_per_kchar=float(os.environ.get("OLLAMA_COST_PER_KCHAR", 0.0)),
+            max_concurrency=int(os.environ.get("OLLAMA_MAX_CONCURRENCY", 2)),
+        )
+        self.enabled = os.environ.get("OLLAMA_ENABLED", "true").lower() == "true"
+        self.base_url = os.environ.get("OLLAMA_URL", "http://localhost:11434").rstrip("/")
+        self.model = os.environ.get("OLLAMA_MODEL", "llama3")
+        self.timeout = aiohttp.ClientTimeout(total=float(os.environ.get("OLLAMA_TIMEOUT", 60)))
+        self.session = None
+
+    @property
+    def available(self) -> bool:
+        """
+        Whether the local backend is enabled.
+        """
+        return self.enabled
+
+    async def initialize(self):
+        """
+        Initialize the aiohttp session.
+        """
+        if self.session is None:
+            self.session = aiohttp.ClientSession(timeout=self.timeout)
+
+    async def complete(self, prompt: str) -> str:
+        """
+        Send a prompt to Ollama's generate API.
+
+        Args:
+            prompt: The full prompt
+
+        Returns:
+            Completion text
+
+        Raises:
+            LLMProviderError: If the request failed or was throttled
+        """
+        await self.initialize()
+
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": False,
+            "options": {
+                "temperature": 0.7,
+                "top_k": 40,
+                "top_p": 0.95,
+                "num_predict": 1024,
+            }
+        }
+
+        try:
+            async with self.session.post(f"{self.base_url}/api/generate", json=payload) as response:
+                if response.status == 200:
+                    result = await response.json()
+                    response_text = result.get("response", "").strip()
+                    if not response_text:
+                        raise LLMProviderError("Ollama returned an empty response")
+                    logger.info(f"Generated AI response (ollama): {response_text[:50]}...")
+                    return response_text
+
+                error_text = await response.text()
+                raise LLMProviderError(
+                    f"Ollama error (status {response.status}): {error_text}",
+                    throttled=response.status in (429, 503)
+                )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise LLMProviderError(f"Ollama request failed: {str(e)}")
+
+    async def close(self):
+        """
+        Close the aiohttp session.
+        """
+        if self.session:
+            await self.session.close()
+            self.session = None
@@ -0,0 +1,293 @@
+import os
+import uuid
+import logging
+import threading
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Column layout of each archived table
+ARCHIVE_TABLES = {
+    "sessions": ["id", "created_at", "is_active"],
+    "transcripts": ["id", "session_id", "text", "timestamp"],
+    "responses": ["id", "session_id", "transcript_id", "text", "timestamp"],
+}
+
+class _PartitionWriter:
+    """
+    Buffers rows per (table, date) partition and writes them in bounded chunks.
+    """
+
+    def __init__(self, root: str, file_format: str, part_name: str, chunk_rows: int):
+        import pyarrow as pa
+
+        self.root = root
+        self.file_format = file_format
+        self.part_name = part_name
+        self.chunk_rows = chunk_rows
+        self.schemas = {
+            "sessions": pa.schema([
+                ("id", pa.string()),
+                ("created_at", pa.timestamp("us")),
+                ("is_active", pa.bool_()),
+            ]),
+            "transcripts": pa.schema([
+                ("id", pa.string()),
+                ("session_id", pa.string()),
+                ("text", pa.string()),
+                ("timestamp", pa.timestamp("us")),
+            ]),
+            "responses": pa.schema([
+                ("id", pa.string()),
+                ("session_id", pa.string()),
+                ("transcript_id", pa.string()),
+                ("text", pa.string()),
+                ("timestamp", pa.timestamp("us")),
+            ]),
+        }
+        self.buffers: Dict[Tuple[str, date], List[tuple]] = {}
+        self.writers: Dict[Tuple[str, date], object] = {}
+        self.rows_written = 0
+        self.files: List[str] = []
+
+    def append(self, table: str, partition: date, row: tuple):
+        key = (table, partition)
+        buffer = self.buffers.setdefault(key, [])
+        buffer.append(row)
+        if len(buffer) >= self.chunk_rows:
+            self._flush(key)
+
+    def _flush(self, key: Tuple[str, date]):
+        import pyarrow as pa
+
+        rows = self.buffers.get(key)
+        if not rows:
+            return
+        table, partition = key
+        schema = self.schemas[table]
+        columns = list(zip(*rows))
+        batch = pa.RecordBatch.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+            schema=schema
+        )
+        self._writer(key, schema).write_batch(batch)
+        self.rows_written += len(rows)
+        self.buffers[key] = []
+
+    def _writer(self, key: Tuple[str, date], schema):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = self.writers.get(key)
+        if writer is not None:
+            return writer
+
+        table, partition = key
+        directory = os.path.join(self.root, table, f"date={partition.isoformat()}")
+        os.makedirs(directory, exist_ok=True)
+        if self.file_format == "arrow":
+            path = os.path.join(directory, f"{self.part_name}.arrow")
+            writer = pa.ipc.new_file(
+                path, schema, options=pa.ipc.IpcWriteOptions(compression="zstd")
+            )
+        else:
+            path = os.path.join(directory, f"{self.part_name}.parquet")
+            writer = pq.ParquetWriter(path, schema, compression="zstd")
+        self.writers[key] = writer
+        self.files.append(path)
+        return writer
+
+    def close(self):
+        for key in list(self.buffers):
+            self._flush(key)
+        for writer in self.writers.values():
+            writer.close()
+        self.writers = {}
+
+
+class ArchiveService:
+    """
+    Service for exporting finished meetings to compressed columnar files.
+
+    Finished (inactive, not yet archived) sessions are streamed out of the
+    database in batches of sessions, with their transcripts and responses
+    fetched in chunks, so memory stays bounded regardless of history size.
+    Files are zstd-compressed Parquet (or Arrow IPC) partitioned by session
+    date, and are queried later through memory-mapped Arrow datasets.
+    """
+
+    def __init__(self):
+        """
+        Initialize the archive service.
+        """
+        self.archive_dir = os.environ.get("ARCHIVE_DIR", "./archive")
+        self.file_format = os.environ.get("ARCHIVE_FORMAT", "parquet").lower()
+        self.session_batch = int(os.environ.get("ARCHIVE_SESSION_BATCH", 500))
+        self.chunk_rows = int(os.environ.get("ARCHIVE_CHUNK_ROWS", 10000))
+        self.available = False
+        self.lock = threading.Lock()
+
+        try:
+            import pyarrow  # noqa: F401
+            self.available = True
+        except ImportError:
+            logger.warning("pyarrow not installed. Meeting archive export will not work.")
+
+    def export(self, session_factory, prune: bool = False) -> Dict:
+        """
+        Export every finished, unarchived session and mark it archived.
+
+        Blocking; run it in an executor.
+
+        Args:
+            session_factory: SQLAlchemy session factory (SessionLocal)
+            prune: Delete archived rows from the hot tables after writing them
+
+        Returns:
+            Summary of the export
+        """
+        if not self.available:
+            raise RuntimeError("pyarrow is not installed")
+        if session_factory is None:
+            raise RuntimeError("Archive export requires a SQL database")
+        if not self.lock.acquire(blocking=False):
+            raise RuntimeError("An archive export is already running")
+
+        try:
+            return self._export(session_factory, prune)
+        finally:
+            self.lock.release()
+
+    def _export(self, session_factory, prune: bool) -> Dict:
+        """
+        Run the export batches; the caller holds the export lock.
+
+        Args:
+            session_factory: SQLAlchemy session factory (SessionLocal)
+            prune: Delete archived rows from the hot tables after writing them
+
+        Returns:
+            Summary of the export
+        """
+        from models.schemas import Session, Transcript, Response
+
+        export_id = datetime.now().strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:8]
+        summary = {"export_id": export_id, "sessions": 0, "rows": 0, "files": [], "pruned": prune}
+        batch_number = 0
+
+        while True:
+            db = session_factory()
+            try:
+                sessions = (
+                    db.query(Session.id, Session.created_at, Session.is_active)
+                    .filter(Session.is_active.is_(False), Session.archived_at.is_(None))
+                    .order_by(Session.id)
+                    .limit(self.session_batch)
+                    .all()
+                )
+                if not sessions:
+                    break
+
+                writer = _PartitionWriter(
+                    self.archive_dir, self.file_format,
+                    f"part-{export_id}-{batch_number:05d}", self.chunk_rows
+                )
+                try:
+                    partitions = {}
+                    for session_id, created_at, is_active in sessions:
+                        partition = (created_at or datetime.now()).date()
+                        partitions[session_id] = partition
+                        writer.append("sessions", partition, (session_id, created_at, is_active))
+
+                    session_ids = list(partitions)
+                    for row in (
+                        db.query(Transcript.id, Transcript.session_id, Transcript.text, Transcript.timestamp)
+                        .filter(Transcript.session_id.in_(session_ids))
+                        .yield_per(self.chunk_rows)
+                    ):
+                        writer.append("transcripts", partitions[row[1]], tuple(row))
+
+                    for row in (
+                        db.query(Response.id, Response.session_id, Response.transcript_id,
+                                 Response.text, Response.timestamp)
+                        .filter(Response.session_id.in_(session_ids))
+                        .yield_per(self.chunk_rows)
+                    ):
+                        writer.append("responses", partitions[row[1]], tuple(row))
+                finally:
+                    writer.close()
+
+                # Files are closed and complete; only now record the batch as archived
+                if prune:
+                    db.query(Response).filter(Response.session_id.in_(session_ids)).delete(synchronize_session=False)
+                    db.query(Transcript).filter(Transcript.session_id.in_(session_ids)).delete(synchronize_session=False)
+                    db.query(Session).filter(Session.id.in_(session_ids)).delete(synchronize_session=False)
+                else:
+                    db.query(Session).filter(Session.id.in_(session_ids)).update(
+                        {Session.archived_at: datetime.now()}, synchronize_session=False
+                    )
+                db.commit()
+
+                summary["sessions"] += len(session_ids)
+                summary["rows"] += writer.rows_written
+                summary["files"].extend(writer.files)
+                batch_number += 1
+            finally:
+                db.close()
+
+        logger.info(f"Archived {summary['sessions']} sessions ({summary['rows']} rows) in export {export_id}")
+        return summary
+
+    def query(self, table: str, start: Optional[date] = None, end: Optional[date] = None,
+              session_id: Optional[str] = None, columns: Optional[List[str]] = None,
+              limit: Optional[int] = None):
+        """
+        Query archived rows through a memory-mapped Arrow dataset.
+
+        Args:
+            table: One of "sessions", "transcripts" or "responses"
+            start: First partition date to include
+            end: Last partition date to include
+            session_id: Only rows for this session
+            columns: Columns to read (defaults to all)
+            limit: Maximum number of rows
+
+        Returns:
+            A pyarrow.Table
+        """
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        import pyarrow.fs as pafs
+
+        if table not in ARCHIVE_TABLES:
+            raise ValueError(f"Unknown archive table: {table}")
+
+        path = os.path.join(self.archive_dir, table)
+        if not os.path.isdir(path):
+            return pa.table({name: [] for name in columns or ARCHIVE_TABLES[table]})
+
+        dataset = ds.dataset(
+            path,
+            format="ipc" if self.file_format == "arrow" else "parquet",
+            partitioning=ds.partitioning(pa.schema([("date", pa.date32())]), flavor="hive"),
+            filesystem=pafs.LocalFileSystem(use_mmap=True),
+        )
+
+        expression = None
+        conditions = []
+        if start:
+            conditions.append(ds.field("date") >= start)
+        if end:
+            conditions.append(ds.field("date") <= end)
+        if session_id:
+            key = "id" if table == "sessions" else "session_id"
+            conditions.append(ds.field(key) == session_id)
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+
+        if limit:
+            return dataset.scanner(columns=columns, filter=expression).head(limit)
+        return dataset.to_table(columns=columns, filter=expression)
@@ -0,0 +1,202 @@
+import os
+import sys
+import time
+import logging
+import asyncio
+import threading
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Deque, Dict, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class LoopMonitorService:
+    """
+    Service for watching the health of the asyncio event loop.
+
+    A probe task wakes on a short heartbeat period and measures event-loop
+    lag (how late each wake-up fires). A separate watchdog thread notices when
+    a wake-up is overdue by more than the stall threshold and captures the
+    loop thread's stack, so synchronous work blocking async handlers shows up
+    with a trace.
+    """
+
+    def __init__(self):
+        """
+        Initialize the loop monitor.
+        """
+        self.probe_interval = float(os.environ.get("LOOP_PROBE_INTERVAL", 0.5))
+        self.stall_threshold = float(os.environ.get("LOOP_STALL_THRESHOLD", 0.25))
+        self.max_stalls = int(os.environ.get("LOOP_MAX_STALLS", 50))
+
+        # Wake well within the stall threshold so a block is noticed soon after
+        # it passes the threshold; lag is still sampled once per probe interval
+        self.heartbeat_period = min(self.probe_interval, self.stall_threshold / 4)
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.loop_thread_id: Optional[int] = None
+        self.probe_task: Optional[asyncio.Task] = None
+        self.watchdog_thread: Optional[threading.Thread] = None
+        self.stopping = threading.Event()
+
+        # When the probe is next due to wake; updated from the loop thread,
+        # read from the watchdog thread
+        self.due_at = time.monotonic()
+
+        self.lag_ms_last = 0.0
+        self.lag_ms_max = 0.0
+        self.lag_samples: Deque[float] = deque(maxlen=240)
+        self.stalls: Deque[Dict] = deque(maxlen=self.max_stalls)
+        self.stalls_total = 0
+
+        self.executors: Dict[str, ThreadPoolExecutor] = {}
+
+    def register_executor(self, name: str, executor: Optional[ThreadPoolExecutor]):
+        """
+        Register a thread pool whose queue depth should be reported.
+
+        Args:
+            name: Name to report the executor under
+            executor: The thread pool (ignored if None)
+        """
+        if executor is not None:
+            self.executors[name] = executor
+
+    def start(self):
+        """
+        Start the lag probe and the watchdog thread on the running loop.
+        """
+        if self.probe_task is not None:
+            return
+
+        self.loop = asyncio.get_event_loop()
+        self.loop_thread_id = threading.get_ident()
+        self.due_at = time.monotonic() + self.heartbeat_period
+        self.stopping.clear()
+
+        self.probe_task = asyncio.create_task(self._probe())
+        self.watchdog_thread = threading.Thread(
+            target=self._watch, name="loop-watchdog", daemon=True
+        )
+        self.watchdog_thread.start()
+
+    async def stop(self):
+        """
+        Stop the lag probe and the watchdog thread.
+        """
+        self.stopping.set()
+        if self.probe_task:
+            self.probe_task.cancel()
+            self.probe_task = None
+
+    async def _probe(self):
+        """
+        Measure how late each heartbeat sleep wakes up; the excess is event-loop lag.
+        """
+        window_started = time.monotonic()
+        window_lag_ms = 0.0
+        while True:
+            self.due_at = time.monotonic() + self.heartbeat_period
+            await asyncio.sleep(self.heartbeat_period)
+            now = time.monotonic()
+
+            lag_ms = max(now - self.due_at, 0.0) * 1000.0
+            self.lag_ms_last = lag_ms
+            self.lag_ms_max = max(self.lag_ms_max, lag_ms)
+            window_lag_ms = max(window_lag_ms, lag_ms)
+
+            # Keep the worst lag of each probe interval as one sample
+            if now - window_started >= self.probe_interval:
+                self.lag_samples.append(window_lag_ms)
+                window_started = now
+                window_lag_ms = 0.0
+
+    def _watch(self):
+        """
+        Watchdog thread: capture the loop thread's stack when a heartbeat is overdue.
+        """
+        captured_for = None
+
+        while not self.stopping.wait(self.heartbeat_period):
+            due_at = self.due_at
+            overdue = time.monotonic() - due_at
+            if overdue < self.stall_threshold or captured_for == due_at:
+                continue
+
+            # One capture per stall, until the loop produces a new heartbeat
+            captured_for = due_at
+            frame = sys._current_frames().get(self.loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "<no frame>"
+            self.stalls_total += 1
+            self.stalls.append({
+                "detected_at": datetime.now().isoformat(),
+                "blocked_ms": round(overdue * 1000.0, 1),
+                "stack": stack,
+            })
+            logger.warning(
+                f"Event loop blocked for over {overdue * 1000.0:.0f} ms:\n{stack}"
+            )
+
+    def executor_stats(self) -> Dict:
+        """
+        Get queue depth and thread count for each registered executor.
+
+        Returns:
+            Dictionary of executor statistics by name
+        """
+        stats = {}
+        for name, executor in self.executors.items():
+            stats[name] = {
+                "max_workers": executor._max_workers,
+                "threads": len(executor._threads),
+                "queued": executor._work_queue.qsize(),
+            }
+        return stats
+
+    def dump_tasks(self, stack_limit: int = 5) -> List[Dict]:
+        """
+        Describe every task on the loop with its current stack.
+
+        Args:
+            stack_limit: Maximum number of frames per task
+
+        Returns:
+            List of task descriptions
+        """
+        tasks = []
+        for task in asyncio.all_tasks(self.loop):
+            coro = task.get_coro()
+            frames = task.get_stack(limit=stack_limit)
+            tasks.append({
+                "name": task.get_name(),
+                "coro": getattr(coro, "__qualname__", repr(coro)),
+                "done": task.done(),
+                "stack": [
+                    f"{frame.f_code.co_filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+                    for frame in frames
+                ],
+            })
+        return tasks
+
+    def stats(self) -> Dict:
+        """
+        Get event-loop lag and stall metrics.
+
+        Returns:
+            Dictionary of metrics
+        """
+        samples = sorted(self.lag_samples)
+        p99 = samples[min(int(len(samples) * 0.99), len(samples) - 1)] if samples else 0.0
+        return {
+            "lag_ms_last": round(self.lag_ms_last, 1),
+            "lag_ms_p99": round(p99, 1),
+            "lag_ms_max": round(self.lag_ms_max, 1),
+            "stall_threshold_ms": self.stall_threshold * 1000.0,
+            "stalls_total": self.stalls_total,
+            "tasks": len(asyncio.all_tasks(self.loop)) if self.loop else 0,
+            "executors": self.executor_stats(),
+        }
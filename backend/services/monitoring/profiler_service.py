@@ -0,0 +1,157 @@
+import os
+import sys
+import time
+import logging
+import asyncio
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ProfilerService:
+    """
+    Service for on-demand profiling of the live process.
+
+    The sampling profiler runs a background thread that snapshots every
+    thread's stack (including executor threads running Whisper) at a fixed
+    interval and aggregates them into collapsed-stack format, which
+    flamegraph.pl and speedscope render directly. The span tracer records
+    wall time per named pipeline stage while a trace is running; when no
+    trace is running, `span` costs a single attribute check.
+    """
+
+    def __init__(self):
+        """
+        Initialize the profiler.
+        """
+        self.max_seconds = float(os.environ.get("PROFILER_MAX_SECONDS", 120))
+        self.max_span_samples = 10000
+        self.lock = asyncio.Lock()
+
+        self.tracing = False
+        self.span_samples: Dict[str, List[float]] = {}
+
+    @property
+    def busy(self) -> bool:
+        """
+        Whether a profile or trace is already running.
+        """
+        return self.lock.locked()
+
+    async def profile(self, seconds: float, interval_ms: float = 10.0) -> str:
+        """
+        Sample all thread stacks for a while and return collapsed stacks.
+
+        Args:
+            seconds: How long to sample
+            interval_ms: Time between samples
+
+        Returns:
+            Collapsed-stack text, one "thread;frame;...;frame count" line per unique stack
+        """
+        seconds = min(max(seconds, 0.1), self.max_seconds)
+        interval = max(interval_ms, 1.0) / 1000.0
+        counts: Counter = Counter()
+        stop = threading.Event()
+
+        async with self.lock:
+            sampler = threading.Thread(
+                target=self._sample, args=(counts, interval, stop),
+                name="profiler-sampler", daemon=True
+            )
+            sampler.start()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                stop.set()
+                # Join on the loop thread: the sampler's wait returns as soon as
+                # stop is set, so this waits for one stack snapshot at most, while
+                # the default executor may be backed up behind Whisper
+                sampler.join()
+
+        logger.info(f"Profiled {seconds:.1f}s: {sum(counts.values())} samples, {len(counts)} unique stacks")
+        return "\n".join(f"{stack} {count}" for stack, count in counts.most_common()) + "\n"
+
+    @staticmethod
+    def _sample(counts: Counter, interval: float, stop: threading.Event):
+        """
+        Sampler thread: record every other thread's current stack until stopped.
+
+        Args:
+            counts: Counter of collapsed stacks to update
+            interval: Seconds between samples
+            stop: Event that ends sampling
+        """
+        own_id = threading.get_ident()
+        while not stop.wait(interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                counts[";".join(reversed(stack))] += 1
+
+    @contextmanager
+    def span(self, name: str):
+        """
+        Attribute the wall time of a block to a named pipeline stage while tracing.
+
+        Args:
+            name: Stage name
+        """
+        if not self.tracing:
+            yield
+            return
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            samples = self.span_samples.setdefault(name, [])
+            if len(samples) < self.max_span_samples:
+                samples.append((time.perf_counter() - started) * 1000.0)
+
+    async def trace(self, seconds: float) -> Dict:
+        """
+        Record pipeline stage spans for a while and summarize them.
+
+        Args:
+            seconds: How long to trace
+
+        Returns:
+            Per-stage count, total, mean, p95 and max in milliseconds
+        """
+        seconds = min(max(seconds, 0.1), self.max_seconds)
+
+        async with self.lock:
+            self.span_samples = {}
+            self.tracing = True
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                self.tracing = False
+            samples, self.span_samples = self.span_samples, {}
+
+        summary = {}
+        for name, values in samples.items():
+            ordered = sorted(values)
+            summary[name] = {
+                "count": len(ordered),
+                "total_ms": round(sum(ordered), 1),
+                "mean_ms": round(sum(ordered) / len(ordered), 1),
+                "p95_ms": round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)], 1),
+                "max_ms": round(ordered[-1], 1),
+            }
+        return {
+            "seconds": seconds,
+            "stages": dict(sorted(summary.items(), key=lambda item: -item[1]["total_ms"])),
+        }
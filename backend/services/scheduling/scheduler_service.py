@@ -0,0 +1,277 @@
+import time
+import heapq
+import logging
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Priority classes, lower runs first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_BACKGROUND: "background",
+}
+
+class JobExpiredError(Exception):
+    """
+    Raised when a job's deadline passed before it could start.
+    """
+
+
+class _Job:
+    """
+    A queued unit of work, ordered by weighted-fair finish tag.
+    """
+
+    __slots__ = ("tenant", "priority", "factory", "deadline", "start_tag", "finish_tag",
+                 "seq", "future", "submitted_at")
+
+    def __init__(self, tenant: str, priority: int, factory: Callable[[], Awaitable[Any]],
+                 deadline: Optional[float], start_tag: float, finish_tag: float, seq: int,
+                 future: asyncio.Future):
+        self.tenant = tenant
+        self.priority = priority
+        self.factory = factory
+        self.deadline = deadline
+        self.start_tag = start_tag
+        self.finish_tag = finish_tag
+        self.seq = seq
+        self.future = future
+        self.submitted_at = time.monotonic()
+
+    def __lt__(self, other: "_Job") -> bool:
+        return (self.finish_tag, self.seq) < (other.finish_tag, other.seq)
+
+
+class _ClassMetrics:
+    """
+    Counters and recent latencies for one priority class.
+    """
+
+    def __init__(self, window: int):
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.expired = 0
+        self.wait_ms: Deque[float] = deque(maxlen=window)
+        self.total_ms: Deque[float] = deque(maxlen=window)
+
+    @staticmethod
+    def _percentile(values: Deque[float], fraction: float) -> Optional[float]:
+        if not values:
+            return None
+        ordered = sorted(values)
+        return round(ordered[min(int(len(ordered) * fraction), len(ordered) - 1)], 1)
+
+    def snapshot(self) -> Dict:
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "expired": self.expired,
+            "wait_ms_p50": self._percentile(self.wait_ms, 0.5),
+            "wait_ms_p95": self._percentile(self.wait_ms, 0.95),
+            "latency_ms_p50": self._percentile(self.total_ms, 0.5),
+            "latency_ms_p95": self._percentile(self.total_ms, 0.95),
+        }
+
+
+class FairSchedulerService:
+    """
+    Service for scheduling STT or LLM jobs fairly across sessions.
+
+    Jobs are grouped into priority classes; within a class they are served in
+    weighted-fair-queueing order by tenant (session), so one busy meeting
+    cannot starve the others. Each tenant is limited to a number of
+    concurrently running jobs, and jobs whose deadline passes while queued are
+    dropped instead of producing results too late to matter.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, tenant_quota: int = 1):
+        """
+        Initialize the scheduler.
+
+        Args:
+            name: Scheduler name (for logging and metrics)
+            max_concurrency: Maximum number of jobs running at once
+            tenant_quota: Maximum number of jobs running at once per tenant
+        """
+        self.name = name
+        self.max_concurrency = max(max_concurrency, 1)
+        self.tenant_quota = max(tenant_quota, 1)
+
+        self.queues: Dict[int, List[_Job]] = {}
+        self.running = 0
+        self.virtual_time = 0.0
+        self.seq = 0
+
+        # Running job tasks; the event loop only keeps weak references
+        self.tasks: Set[asyncio.Task] = set()
+
+        # Per-tenant state; dropped when a tenant has nothing queued or running
+        self.tenant_finish: Dict[str, float] = {}
+        self.tenant_running: Dict[str, int] = {}
+        self.tenant_queued: Dict[str, int] = {}
+
+        self.metrics: Dict[int, _ClassMetrics] = {
+            priority: _ClassMetrics(window=1000) for priority in PRIORITY_NAMES
+        }
+
+    async def run(self, tenant: str, priority: int, factory: Callable[[], Awaitable[Any]],
+                  cost: float = 1.0, weight: float = 1.0, deadline: Optional[float] = None) -> Any:
+        """
+        Queue a job and wait for its result.
+
+        Args:
+            tenant: Tenant (session) the job belongs to
+            priority: Priority class (PRIORITY_INTERACTIVE or PRIORITY_BACKGROUND)
+            factory: Zero-argument callable returning the coroutine to run
+            cost: Relative cost of the job (e.g. seconds of audio)
+            weight: Tenant weight; a higher weight gets a larger share
+            deadline: `time.monotonic()` deadline after which the job is dropped if not started
+
+        Returns:
+            The job's result
+
+        Raises:
+            JobExpiredError: If the deadline passed before the job started
+        """
+        start_tag = max(self.virtual_time, self.tenant_finish.get(tenant, 0.0))
+        finish_tag = start_tag + max(cost, 1e-6) / max(weight, 1e-6)
+        self.tenant_finish[tenant] = finish_tag
+        self.tenant_queued[tenant] = self.tenant_queued.get(tenant, 0) + 1
+        self.seq += 1
+
+        job = _Job(tenant, priority, factory, deadline, start_tag, finish_tag, self.seq,
+                   asyncio.get_event_loop().create_future())
+        heapq.heappush(self.queues.setdefault(priority, []), job)
+        self._class_metrics(priority).submitted += 1
+
+        self._dispatch()
+        return await job.future
+
+    def _class_metrics(self, priority: int) -> _ClassMetrics:
+        if priority not in self.metrics:
+            self.metrics[priority] = _ClassMetrics(window=1000)
+        return self.metrics[priority]
+
+    def _dispatch(self):
+        """
+        Start queued jobs while there is free capacity.
+        """
+        while self.running < self.max_concurrency:
+            job = self._next_job()
+            if job is None:
+                return
+            self._start(job)
+
+    def _next_job(self) -> Optional[_Job]:
+        """
+        Pop the next runnable job: highest priority class first, then lowest
+        finish tag among tenants under their quota. Expired and cancelled jobs
+        are discarded along the way.
+        """
+        now = time.monotonic()
+        for priority in sorted(self.queues):
+            heap = self.queues[priority]
+            skipped = []
+            found = None
+            while heap:
+                job = heapq.heappop(heap)
+                if job.future.done():
+                    # Caller gave up waiting
+                    self._dequeued(job)
+                    continue
+                if job.deadline is not None and now > job.deadline:
+                    self._dequeued(job)
+                    self._class_metrics(priority).expired += 1
+                    job.future.set_exception(JobExpiredError(f"{self.name} job for {job.tenant} expired"))
+                    continue
+                if self.tenant_running.get(job.tenant, 0) >= self.tenant_quota:
+                    skipped.append(job)
+                    continue
+                found = job
+                break
+
+            for job in skipped:
+                heapq.heappush(heap, job)
+            if found:
+                return found
+        return None
+
+    def _dequeued(self, job: _Job):
+        """
+        Update tenant bookkeeping for a job leaving the queue.
+        """
+        self.tenant_queued[job.tenant] -= 1
+        self._forget_idle_tenant(job.tenant)
+
+    def _forget_idle_tenant(self, tenant: str):
+        """
+        Drop state for a tenant with nothing queued or running, so idle tenants
+        neither bank credit nor hold memory.
+        """
+        if self.tenant_queued.get(tenant, 0) <= 0 and self.tenant_running.get(tenant, 0) <= 0:
+            self.tenant_queued.pop(tenant, None)
+            self.tenant_running.pop(tenant, None)
+            self.tenant_finish.pop(tenant, None)
+
+    def _start(self, job: _Job):
+        """
+        Run a job in its own task.
+        """
+        self.running += 1
+        self.tenant_queued[job.tenant] -= 1
+        self.tenant_running[job.tenant] = self.tenant_running.get(job.tenant, 0) + 1
+        self.virtual_time = max(self.virtual_time, job.start_tag)
+        task = asyncio.create_task(self._execute(job))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _execute(self, job: _Job):
+        """
+        Await a job's coroutine and deliver its result to the waiting caller.
+        """
+        metrics = self._class_metrics(job.priority)
+        started = time.monotonic()
+        metrics.wait_ms.append((started - job.submitted_at) * 1000.0)
+        try:
+            result = await job.factory()
+            metrics.completed += 1
+            if not job.future.done():
+                job.future.set_result(result)
+        except Exception as e:
+            metrics.failed += 1
+            if not job.future.done():
+                job.future.set_exception(e)
+        finally:
+            metrics.total_ms.append((time.monotonic() - job.submitted_at) * 1000.0)
+            self.running -= 1
+            self.tenant_running[job.tenant] -= 1
+            self._forget_idle_tenant(job.tenant)
+            self._dispatch()
+
+    def stats(self) -> Dict:
+        """
+        Get queue depths and per-class latency metrics.
+
+        Returns:
+            Dictionary of statistics
+        """
+        return {
+            "running": self.running,
+            "max_concurrency": self.max_concurrency,
+            "tenant_quota": self.tenant_quota,
+            "queued": sum(len(heap) for heap in self.queues.values()),
+            "tenants": len(self.tenant_finish),
+            "classes": {
+                PRIORITY_NAMES.get(priority, str(priority)): metrics.snapshot()
+                for priority, metrics in self.metrics.items()
+            },
+        }
@@ -0,0 +1,228 @@
+import os
+import json
+import logging
+import asyncio
+from typing import Dict, Optional
+
+from fastapi import WebSocket
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class Subscriber:
+    """
+    One viewer of a session: a WebSocket with its own bounded send queue.
+    """
+
+    def __init__(self, websocket: WebSocket, max_queue: int):
+        """
+        Initialize the subscriber.
+
+        Args:
+            websocket: Connection to send messages on
+            max_queue: Maximum number of messages waiting to be sent
+        """
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.consecutive_drops = 0
+        self.dropped_total = 0
+        self.sender_task: Optional[asyncio.Task] = None
+
+    async def run(self):
+        """
+        Send queued messages until cancelled or the connection fails.
+        """
+        while True:
+            payload = await self.queue.get()
+            try:
+                await self.websocket.send_text(payload)
+            except Exception as e:
+                logger.info(f"Stopping subscriber sender: {str(e)}")
+                return
+            self.consecutive_drops = 0
+
+
+class BroadcastService:
+    """
+    Service for fanning session messages out to every connected viewer.
+
+    Each message is serialized once and put on every subscriber's bounded
+    queue; a dedicated sender task per subscriber drains it. When a queue is
+    full the oldest message is dropped, and a subscriber that keeps falling
+    behind is disconnected, so one slow viewer never blocks processing or
+    other viewers.
+    """
+
+    def __init__(self):
+        """
+        Initialize the broadcast service.
+        """
+        self.max_queue = int(os.environ.get("BROADCAST_MAX_QUEUE", 32))
+        self.max_consecutive_drops = int(os.environ.get("BROADCAST_MAX_CONSECUTIVE_DROPS", 64))
+
+        # Subscribers by session ID, then by WebSocket
+        self.subscribers: Dict[str, Dict[WebSocket, Subscriber]] = {}
+        self.messages_published = 0
+        self.messages_dropped = 0
+        self.slow_consumers_disconnected = 0
+
+    def subscribe(self, session_id: str, websocket: WebSocket):
+        """
+        Add a viewer to a session.
+
+        Args:
+            session_id: Session to subscribe to
+            websocket: The viewer's connection
+        """
+        session_subscribers = self.subscribers.setdefault(session_id, {})
+        if websocket in session_subscribers:
+            return
+
+        subscriber = Subscriber(websocket, self.max_queue)
+        subscriber.sender_task = asyncio.create_task(subscriber.run())
+        session_subscribers[websocket] = subscriber
+
+    def unsubscribe(self, session_id: str, websocket: WebSocket) -> bool:
+        """
+        Remove a viewer from a session.
+
+        Args:
+            session_id: Session to unsubscribe from
+            websocket: The viewer's connection
+
+        Returns:
+            True if the viewer was subscribed
+        """
+        session_subscribers = self.subscribers.get(session_id)
+        if not session_subscribers or websocket not in session_subscribers:
+            return False
+
+        subscriber = session_subscribers.pop(websocket)
+        subscriber.sender_task.cancel()
+        if not session_subscribers:
+            del self.subscribers[session_id]
+        return True
+
+    def is_subscribed(self, session_id: str, websocket: WebSocket) -> bool:
+        """
+        Check whether a connection is subscribed to a session.
+
+        Args:
+            session_id: Session to check
+            websocket: Connection to check
+
+        Returns:
+            True if subscribed
+        """
+        return websocket in self.subscribers.get(session_id, {})
+
+    def subscriber_count(self, session_id: str) -> int:
+        """
+        Get the number of viewers of a session.
+
+        Args:
+            session_id: Session to count viewers for
+
+        Returns:
+            Number of subscribers
+        """
+        return len(self.subscribers.get(session_id, {}))
+
+    def publish(self, session_id: str, message: Dict) -> int:
+        """
+        Serialize a message once and queue it for every viewer of a session.
+
+        Args:
+            session_id: Session to publish to
+            message: JSON-serializable message
+
+        Returns:
+            Number of subscribers the message was queued for
+        """
+        session_subscribers = self.subscribers.get(session_id)
+        if not session_subscribers:
+            return 0
+
+        payload = self.serialize(message)
+        self.messages_published += 1
+
+        for websocket, subscriber in list(session_subscribers.items()):
+            if subscriber.queue.full():
+                # Drop-oldest: a slow viewer loses stale messages, never blocks others
+                subscriber.queue.get_nowait()
+                subscriber.consecutive_drops += 1
+                subscriber.dropped_total += 1
+                self.messages_dropped += 1
+
+                if subscriber.consecutive_drops >= self.max_consecutive_drops:
+                    logger.warning(f"Disconnecting slow subscriber on session {session_id}")
+                    self.slow_consumers_disconnected += 1
+                    self.unsubscribe(session_id, websocket)
+                    asyncio.create_task(self._close(websocket))
+                    continue
+
+            subscriber.queue.put_nowait(payload)
+
+        return len(session_subscribers)
+
+    def close_session(self, session_id: str):
+        """
+        Drop every viewer of a session.
+
+        Args:
+            session_id: Session to close
+        """
+        for websocket in list(self.subscribers.get(session_id, {})):
+            self.unsubscribe(session_id, websocket)
+
+    @staticmethod
+    def serialize(message: Dict) -> str:
+        """
+        Serialize a message to JSON text, using orjson when it is installed.
+
+        Args:
+            message: JSON-serializable message
+
+        Returns:
+            JSON text
+        """
+        if orjson is not None:
+            return orjson.dumps(message).decode()
+        return json.dumps(message)
+
+    @staticmethod
+    async def _close(websocket: WebSocket):
+        """
+        Close a connection, ignoring errors from an already-closed socket.
+
+        Args:
+            websocket: Connection to close
+        """
+        try:
+            await websocket.close(code=1013)
+        except Exception:
+            pass
+
+    def stats(self) -> Dict:
+        """
+        Get fan-out gauges and counters.
+
+        Returns:
+            Dictionary of gauges and counters
+        """
+        return {
+            "sessions": len(self.subscribers),
+            "subscribers": sum(len(s) for s in self.subscribers.values()),
+            "queued_messages": sum(
+                sub.queue.qsize() for s in self.subscribers.values() for sub in s.values()
+            ),
+            "messages_published": self.messages_published,
+            "messages_dropped": self.messages_dropped,
+            "slow_consumers_disconnected": self.slow_consumers_disconnected,
+        }
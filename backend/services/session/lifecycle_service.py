@@ -0,0 +1,293 @@
+import os
+import time
+import heapq
+import logging
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Eviction hook: receives the session ID and its state while the session is
+# still registered, after its in-flight tasks have finished
+EvictionHook = Callable[[str, Dict], Awaitable[None]]
+
+class SessionLifecycleService:
+    """
+    Service for bounding the number and memory of in-process sessions.
+
+    Sessions without a connected client are evicted after an idle TTL, using
+    a heap of deadlines with lazy invalidation. The total number of sessions
+    and the audio buffered per session are capped. On eviction, pending work
+    is flushed and registered hooks run (e.g. marking the DB row inactive).
+    """
+
+    def __init__(self):
+        """
+        Initialize the session lifecycle service.
+        """
+        self.idle_ttl = float(os.environ.get("SESSION_IDLE_TTL", 900))
+        self.max_sessions = int(os.environ.get("SESSION_MAX_SESSIONS", 1000))
+        self.max_buffered_audio = int(os.environ.get("SESSION_MAX_BUFFERED_AUDIO_BYTES", 4 * 1024 * 1024))
+        self.sweep_interval = float(os.environ.get("SESSION_SWEEP_INTERVAL", 30))
+        self.flush_timeout = float(os.environ.get("SESSION_FLUSH_TIMEOUT", 10))
+
+        # Session state by ID; main.py exposes this as `active_sessions`
+        self.sessions: Dict[str, Dict] = {}
+
+        # (deadline, session_id) entries; stale entries are skipped when popped
+        self.deadlines: List[Tuple[float, str]] = []
+
+        self.eviction_hooks: List[EvictionHook] = []
+        self.evictions_total = 0
+        self.dropped_audio_chunks = 0
+        self.sweeper_task: Optional[asyncio.Task] = None
+
+    def add_eviction_hook(self, hook: EvictionHook):
+        """
+        Register a coroutine to run when a session is evicted.
+
+        Args:
+            hook: Coroutine function taking (session_id, state)
+        """
+        self.eviction_hooks.append(hook)
+
+    async def create(self, session_id: str, state: Dict) -> bool:
+        """
+        Register a new session, evicting the least recently active idle session if at capacity.
+
+        Args:
+            session_id: ID of the new session
+            state: Initial session state
+
+        Returns:
+            True if the session was created, False if the server is at capacity
+        """
+        if len(self.sessions) >= self.max_sessions:
+            idle = [
+                (s["last_active"], sid) for sid, s in self.sessions.items()
+                if not s["connected"]
+            ]
+            if not idle:
+                logger.warning(f"Session cap of {self.max_sessions} reached; rejecting new session")
+                return False
+            _, oldest = min(idle)
+            await self.evict(oldest, reason="capacity")
+
+        state.setdefault("tasks", set())
+        state["connected"] = True
+        state["last_active"] = time.monotonic()
+        state["buffered_audio"] = 0
+        self.sessions[session_id] = state
+        return True
+
+    def touch(self, session_id: str):
+        """
+        Record activity on a session.
+
+        Args:
+            session_id: Session that received a message
+        """
+        session = self.sessions.get(session_id)
+        if session:
+            session["last_active"] = time.monotonic()
+
+    def mark_connected(self, session_id: str):
+        """
+        Mark a session as having a connected client (exempt from idle eviction).
+
+        Args:
+            session_id: Session that a client (re)connected to
+        """
+        session = self.sessions.get(session_id)
+        if session:
+            session["connected"] = True
+            session["last_active"] = time.monotonic()
+
+    def mark_disconnected(self, session_id: str):
+        """
+        Mark a session as disconnected and schedule its idle deadline.
+
+        Args:
+            session_id: Session whose client disconnected
+        """
+        session = self.sessions.get(session_id)
+        if session:
+            session["connected"] = False
+            session["last_active"] = time.monotonic()
+            heapq.heappush(self.deadlines, (session["last_active"] + self.idle_ttl, session_id))
+
+    def track_task(self, session_id: str, task: asyncio.Task):
+        """
+        Track background work for a session so it can be flushed on eviction.
+
+        Args:
+            session_id: Session the work belongs to
+            task: The background task
+        """
+        session = self.sessions.get(session_id)
+        if session is None:
+            return
+        session["tasks"].add(task)
+        task.add_done_callback(session["tasks"].discard)
+
+    def reserve_audio(self, session_id: str, nbytes: int) -> bool:
+        """
+        Reserve buffer space for an audio chunk awaiting processing.
+
+        Args:
+            session_id: Session the audio belongs to
+            nbytes: Size of the audio chunk in bytes
+
+        Returns:
+            True if reserved, False if the chunk would exceed the per-session cap
+        """
+        session = self.sessions.get(session_id)
+        if session is None:
+            return False
+        if session["buffered_audio"] + nbytes > self.max_buffered_audio:
+            self.dropped_audio_chunks += 1
+            logger.warning(f"Dropping audio chunk for session {session_id}: buffered audio cap reached")
+            return False
+        session["buffered_audio"] += nbytes
+        return True
+
+    def release_audio(self, session_id: str, nbytes: int):
+        """
+        Release buffer space reserved with `reserve_audio`.
+
+        Args:
+            session_id: Session the audio belongs to
+            nbytes: Size of the audio chunk in bytes
+        """
+        session = self.sessions.get(session_id)
+        if session:
+            session["buffered_audio"] = max(session["buffered_audio"] - nbytes, 0)
+
+    async def evict(self, session_id: str, reason: str = "idle"):
+        """
+        Flush pending work for a session, run eviction hooks and drop its state.
+
+        The session stays registered until its in-flight tasks and the hooks
+        have finished, so work completing during the flush still finds it.
+
+        Args:
+            session_id: Session to evict
+            reason: Why the session is being evicted (for logging)
+        """
+        session = self.sessions.get(session_id)
+        if session is None or session.get("evicting"):
+            return
+        session["evicting"] = True
+
+        try:
+            # Tasks may start more tasks while finishing (e.g. an AI response
+            # after a transcript), so wait until none are left or time is up
+            loop = asyncio.get_event_loop()
+            deadline = loop.time() + self.flush_timeout
+            while session["tasks"]:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    for task in list(session["tasks"]):
+                        task.cancel()
+                    break
+                await asyncio.wait(list(session["tasks"]), timeout=remaining)
+
+            for hook in self.eviction_hooks:
+                try:
+                    await hook(session_id, session)
+                except Exception as e:
+                    logger.error(f"Error in eviction hook for session {session_id}: {str(e)}")
+        finally:
+            self.sessions.pop(session_id, None)
+
+        self.evictions_total += 1
+        logger.info(f"Evicted session {session_id} ({reason})")
+
+    async def evict_expired(self) -> int:
+        """
+        Evict every disconnected session whose idle deadline has passed.
+
+        Returns:
+            Number of sessions evicted
+        """
+        now = time.monotonic()
+        evicted = 0
+        while self.deadlines and self.deadlines[0][0] <= now:
+            _, session_id = heapq.heappop(self.deadlines)
+            session = self.sessions.get(session_id)
+
+            # Skip stale entries: session gone, reconnected, or active since this deadline was set
+            if session is None or session["connected"]:
+                continue
+            if session["last_active"] + self.idle_ttl > now:
+                heapq.heappush(self.deadlines, (session["last_active"] + self.idle_ttl, session_id))
+                continue
+
+            await self.evict(session_id)
+            evicted += 1
+        return evicted
+
+    async def run(self):
+        """
+        Periodically evict expired sessions until cancelled.
+        """
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                await self.evict_expired()
+            except Exception as e:
+                logger.error(f"Error sweeping idle sessions: {str(e)}")
+
+    def start(self):
+        """
+        Start the background sweeper.
+        """
+        if self.sweeper_task is None:
+            self.sweeper_task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """
+        Stop the sweeper and evict every remaining session.
+        """
+        if self.sweeper_task:
+            self.sweeper_task.cancel()
+            self.sweeper_task = None
+
+        await asyncio.gather(*(
+            self.evict(session_id, reason="shutdown") for session_id in list(self.sessions)
+        ))
+
+    def stats(self) -> Dict:
+        """
+        Get memory-usage gauges for the session store.
+
+        Returns:
+            Dictionary of gauges
+        """
+        return {
+            "sessions": len(self.sessions),
+            "connected_sessions": sum(1 for s in self.sessions.values() if s["connected"]),
+            "max_sessions": self.max_sessions,
+            "pending_tasks": sum(len(s["tasks"]) for s in self.sessions.values()),
+            "buffered_audio_bytes": sum(s["buffered_audio"] for s in self.sessions.values()),
+            "deadline_heap_size": len(self.deadlines),
+            "evictions_total": self.evictions_total,
+            "dropped_audio_chunks": self.dropped_audio_chunks,
+            "process_rss_bytes": self._process_rss(),
+        }
+
+    @staticmethod
+    def _process_rss() -> Optional[int]:
+        """
+        Get the current resident set size of this process.
+
+        Returns:
+            RSS in bytes, or None if unavailable on this platform
+        """
+        try:
+            with open("/proc/self/statm") as statm:
+                return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return None
@@ -0,0 +1,311 @@
+import os
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class AudioSequenceTracker:
+    """
+    Which audio sequence numbers of one stream have been processed.
+
+    Every sequence number up to the high-water mark has been transcribed; the
+    few finished out of order above it are kept in a set until the gap below
+    them fills in. Chunks being transcribed are tracked separately, so they
+    are neither processed twice nor acked before they are done.
+    """
+
+    def __init__(self, window: int):
+        """
+        Initialize the tracker.
+
+        Args:
+            window: How far above the high-water mark a gap may stay open
+        """
+        self.window = window
+        self.high_water = 0
+        self.done: Set[int] = set()
+        self.in_flight: Set[int] = set()
+        self.retries: Dict[int, int] = {}
+
+    def begin(self, seq: int) -> bool:
+        """
+        Claim a sequence number for processing.
+
+        Args:
+            seq: Sequence number of the chunk (starting at 1)
+
+        Returns:
+            True if the chunk is neither processed nor in progress, False for duplicates
+        """
+        if seq <= self.high_water or seq in self.done or seq in self.in_flight:
+            return False
+
+        # The client's resend buffer is smaller than the window, so a gap this
+        # old can never be filled; give up on it rather than stall the ack
+        if seq - self.high_water > self.window:
+            self.high_water = seq - self.window
+            self.done = {s for s in self.done if s > self.high_water}
+            self.retries = {s: n for s, n in self.retries.items() if s > self.high_water}
+            self._advance()
+
+        self.in_flight.add(seq)
+        return True
+
+    def finish(self, seq: int):
+        """
+        Record a claimed chunk as processed, advancing the high-water mark.
+
+        Args:
+            seq: Sequence number claimed with `begin`
+        """
+        self.in_flight.discard(seq)
+        self.retries.pop(seq, None)
+        if seq > self.high_water:
+            self.done.add(seq)
+            self._advance()
+
+    def abort(self, seq: int) -> int:
+        """
+        Release a claimed chunk without processing it, so a resend is accepted.
+
+        Args:
+            seq: Sequence number claimed with `begin`
+
+        Returns:
+            How many times the chunk has now been released
+        """
+        self.in_flight.discard(seq)
+        self.retries[seq] = self.retries.get(seq, 0) + 1
+        return self.retries[seq]
+
+    def _advance(self):
+        while self.high_water + 1 in self.done:
+            self.high_water += 1
+            self.done.remove(self.high_water)
+
+
+class ReplayService:
+    """
+    Service for making reconnects lossless without repeating inference.
+
+    Clients number their audio chunks and keep unacknowledged ones in a
+    bounded resend buffer. Numbering is per stream: each page load picks a
+    fresh stream ID, so a reloaded page or a second tab starting again from
+    1 is not mistaken for a resend. The server claims each (stream, sequence
+    number) once and drops resent duplicates before they reach Whisper or
+    the LLM. A chunk is acked only once it has been transcribed. A chunk
+    rejected because the server is momentarily full (buffer cap) is released
+    and the client is asked to resend it, with a doubling delay and a limit on
+    attempts so an overloaded server is not met by a retry storm. A chunk
+    whose STT deadline passed is stale for good: it is acked and counted as
+    expired, never retried. AI responses published while a client was away are
+    replayed from the database when it reconnects.
+    """
+
+    def __init__(self):
+        """
+        Initialize the replay service.
+        """
+        self.sequence_window = int(os.environ.get("REPLAY_SEQUENCE_WINDOW", 256))
+        self.max_replay = int(os.environ.get("REPLAY_MAX_RESPONSES", 50))
+        self.max_streams = int(os.environ.get("REPLAY_MAX_STREAMS", 8))
+        self.retry_delay_ms = int(os.environ.get("REPLAY_RETRY_DELAY_MS", 2000))
+        self.max_retries = int(os.environ.get("REPLAY_MAX_RETRIES", 4))
+
+        self.accepted_total = 0
+        self.duplicates_total = 0
+        self.retries_total = 0
+        self.expired_total = 0
+        self.dropped_total = 0
+        self.replayed_total = 0
+
+    def tracker(self, session: Dict, stream_id: str) -> AudioSequenceTracker:
+        """
+        Get (or create) the sequence tracker for one of a session's audio streams.
+
+        Only the most recently used streams are kept per session.
+
+        Args:
+            session: Session state holding the "audio_streams" trackers
+            stream_id: Client-chosen ID of the audio stream
+
+        Returns:
+            The stream's tracker
+        """
+        streams = session.setdefault("audio_streams", OrderedDict())
+        tracker = streams.get(stream_id)
+        if tracker is None:
+            tracker = streams[stream_id] = AudioSequenceTracker(self.sequence_window)
+            while len(streams) > self.max_streams:
+                streams.popitem(last=False)
+        else:
+            streams.move_to_end(stream_id)
+        return tracker
+
+    def begin(self, session: Dict, stream_id: str, seq: Optional[int]) -> bool:
+        """
+        Decide whether an audio chunk should be processed, claiming it if so.
+
+        Args:
+            session: Session state holding the "audio_streams" trackers
+            stream_id: Audio stream the chunk belongs to
+            seq: The chunk's sequence number (None or 0 for unsequenced clients)
+
+        Returns:
+            True if the chunk is new and should be processed
+        """
+        if not seq:
+            return True
+
+        if self.tracker(session, stream_id).begin(seq):
+            return True
+
+        self.duplicates_total += 1
+        return False
+
+    def finish(self, session: Dict, stream_id: str, seq: int) -> Dict:
+        """
+        Record a claimed chunk as transcribed.
+
+        Args:
+            session: Session state holding the "audio_streams" trackers
+            stream_id: Audio stream the chunk belongs to
+            seq: The chunk's sequence number
+
+        Returns:
+            audio_ack message for the stream
+        """
+        self.tracker(session, stream_id).finish(seq)
+        self.accepted_total += 1
+        return self.ack(session, stream_id)
+
+    def expire(self, session: Dict, stream_id: str, seq: int) -> Dict:
+        """
+        Record a claimed chunk whose deadline passed before transcription.
+
+        Its transcript would arrive too late to matter, so it is settled like
+        a transcribed chunk rather than resent.
+
+        Args:
+            session: Session state holding the "audio_streams" trackers
+            stream_id: Audio stream the chunk belongs to
+            seq: The chunk's sequence number
+
+        Returns:
+            audio_ack message for the stream
+        """
+        self.tracker(session, stream_id).finish(seq)
+        self.expired_total += 1
+        return self.ack(session, stream_id)
+
+    def abort(self, session: Dict, stream_id: str, seq: int) -> Dict:
+        """
+        Release a claimed chunk that was rejected because the server was full.
+
+        The delay before the resend doubles with each attempt; once the chunk
+        has been retried `max_retries` times it is given up and acked.
+
+        Args:
+            session: Session state holding the "audio_streams" trackers
+            stream_id: Audio stream the chunk belongs to
+            seq: The chunk's sequence number
+
+        Returns:
+            audio_retry message asking the client to resend the chunk, or the
+            stream's audio_ack once the chunk is given up
+        """
+        tracker = self.tracker(session, stream_id)
+        attempt = tracker.abort(seq)
+        if attempt > self.max_retries:
+            tracker.finish(seq)
+            self.dropped_total += 1
+            logger.warning(f"Dropped audio chunk {seq} of stream {stream_id} after {self.max_retries} retries")
+            return self.ack(session, stream_id)
+
+        self.retries_total += 1
+        return {
+            "type": "audio_retry",
+            "seq": seq,
+            "retryAfterMs": self.retry_delay_ms * 2 ** (attempt - 1),
+        }
+
+    def ack(self, session: Dict, stream_id: str) -> Dict:
+        """
+        Build the cumulative acknowledgement for an audio stream.
+
+        Args:
+            session: Session state holding the "audio_streams" trackers
+            stream_id: Audio stream to acknowledge
+
+        Returns:
+            audio_ack message
+        """
+        return {"type": "audio_ack", "seq": self.tracker(session, stream_id).high_water}
+
+    def missed_responses(self, session_factory, session_id: str,
+                         last_response_id: Optional[str]) -> List[Dict]:
+        """
+        Load the AI responses a reconnecting client has not seen.
+
+        Blocking; run it in an executor.
+
+        Args:
+            session_factory: SQLAlchemy session factory (SessionLocal), or None
+            session_id: Session the client reconnected to
+            last_response_id: ID of the last response the client received, if any
+
+        Returns:
+            ai_response messages, oldest first
+        """
+        from models.schemas import Response
+
+        if session_factory is None:
+            return []
+
+        db = session_factory()
+        try:
+            query = db.query(Response.id, Response.text, Response.timestamp).filter(
+                Response.session_id == session_id
+            )
+
+            anchor = db.get(Response, last_response_id) if last_response_id else None
+            if anchor is not None:
+                query = query.filter(
+                    Response.timestamp >= anchor.timestamp, Response.id != anchor.id
+                )
+
+            # Newest first so the limit keeps the most recent, then put back in order
+            rows = query.order_by(Response.timestamp.desc()).limit(self.max_replay).all()
+        finally:
+            db.close()
+
+        self.replayed_total += len(rows)
+        return [
+            {
+                "type": "ai_response",
+                "responseId": response_id,
+                "response": text,
+                "timestamp": timestamp.isoformat(),
+                "replayed": True,
+            }
+            for response_id, text, timestamp in reversed(rows)
+        ]
+
+    def stats(self) -> Dict:
+        """
+        Get deduplication and replay counters.
+
+        Returns:
+            Dictionary of counters
+        """
+        return {
+            "audio_accepted": self.accepted_total,
+            "audio_duplicates": self.duplicates_total,
+            "audio_retries": self.retries_total,
+            "audio_expired": self.expired_total,
+            "audio_dropped": self.dropped_total,
+            "responses_replayed": self.replayed_total,
+        }
@@ -0,0 +1,178 @@
+import os
+import logging
+import struct
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Binary WebSocket frame kinds (first byte of every binary frame)
+FRAME_OPUS = 0x01
+FRAME_PCM16 = 0x02
+FRAME_SCREEN = 0x03
+
+# Frame header: kind (1 byte) + sample rate (4 bytes, big-endian; zero for screen frames)
+# + audio sequence number (4 bytes, big-endian; zero when unsequenced)
+FRAME_HEADER = struct.Struct(">BII")
+
+class CaptureService:
+    """
+    Service for negotiating audio/screen capture parameters with clients.
+
+    Whisper only needs 16 kHz mono audio, so the server tells each client
+    which sample rate and chunk duration to use, and whether to downsample
+    and run voice activity detection before sending. The chunk duration is
+    adjusted on the fly from the number of audio jobs waiting on the server.
+    """
+
+    def __init__(self, opus_available: bool = False, screen_enabled: bool = False):
+        """
+        Initialize the capture service.
+
+        Args:
+            opus_available: Whether the server can decode the Opus transport
+            screen_enabled: Whether the server processes screen frames
+        """
+        self.opus_available = opus_available
+        self.screen_enabled = screen_enabled
+        self.target_sample_rate = int(os.environ.get("CAPTURE_SAMPLE_RATE", 16000))
+        self.default_chunk_ms = int(os.environ.get("CAPTURE_CHUNK_MS", 2000))
+        self.min_chunk_ms = int(os.environ.get("CAPTURE_MIN_CHUNK_MS", 1000))
+        self.max_chunk_ms = int(os.environ.get("CAPTURE_MAX_CHUNK_MS", 10000))
+        self.chunk_step_ms = 500
+        self.screen_interval_ms = int(os.environ.get("CAPTURE_SCREEN_INTERVAL_MS", 5000))
+        self.client_downsample = os.environ.get("CAPTURE_CLIENT_DOWNSAMPLE", "true").lower() == "true"
+        self.client_vad = os.environ.get("CAPTURE_CLIENT_VAD", "true").lower() == "true"
+
+        # Number of queued audio jobs per chunk-duration doubling
+        self.queue_high_water = int(os.environ.get("CAPTURE_QUEUE_HIGH_WATER", 4))
+
+        # Audio jobs currently queued or running across all sessions
+        self.pending_jobs = 0
+
+    def negotiate(self, client_sample_rate: Optional[int] = None,
+                  client_transports: Optional[List[str]] = None) -> Dict:
+        """
+        Build the capture parameters sent to a client in `session_created`.
+
+        Args:
+            client_sample_rate: Native sample rate reported by the client, if known
+            client_transports: Audio transports the client can produce (e.g. ["opus", "pcm"])
+
+        Returns:
+            Capture parameters for the client
+        """
+        downsample = self.client_downsample
+        if client_sample_rate and client_sample_rate <= self.target_sample_rate:
+            # Nothing to gain from resampling on the client
+            downsample = False
+
+        transport = "pcm"
+        if self.opus_available and client_transports and "opus" in client_transports:
+            transport = "opus"
+
+        return {
+            "transport": transport,
+            "sampleRate": self.target_sample_rate,
+            "chunkDurationMs": self.chunk_duration_ms(),
+            "screenCapture": self.screen_enabled,
+            "screenIntervalMs": self.screen_interval_ms,
+            "downsample": downsample,
+            "vad": self.client_vad,
+        }
+
+    def chunk_duration_ms(self, queue_depth: Optional[int] = None) -> int:
+        """
+        Compute the audio chunk duration for the given server queue depth.
+
+        Larger chunks under load mean fewer, better-batched Whisper calls.
+
+        Args:
+            queue_depth: Number of pending audio jobs (defaults to the current count)
+
+        Returns:
+            Chunk duration in milliseconds, rounded to the chunk step
+        """
+        if queue_depth is None:
+            queue_depth = self.pending_jobs
+
+        scale = 1.0 + max(queue_depth, 0) / max(self.queue_high_water, 1)
+        duration = self.default_chunk_ms * scale
+        duration = round(duration / self.chunk_step_ms) * self.chunk_step_ms
+        return int(min(max(duration, self.min_chunk_ms), self.max_chunk_ms))
+
+    def adjust(self, current_params: Dict) -> Optional[Dict]:
+        """
+        Recompute a session's capture parameters from the current queue depth.
+
+        Args:
+            current_params: Capture parameters last sent to the client
+
+        Returns:
+            Updated parameters if the chunk duration changed, None otherwise
+        """
+        chunk_ms = self.chunk_duration_ms()
+        if chunk_ms == current_params.get("chunkDurationMs"):
+            return None
+
+        logger.info(f"Adjusting audio chunk duration to {chunk_ms} ms (queue depth {self.pending_jobs})")
+        return {**current_params, "chunkDurationMs": chunk_ms}
+
+    def job_started(self):
+        """
+        Record that an audio job has been queued.
+        """
+        self.pending_jobs += 1
+
+    def job_finished(self):
+        """
+        Record that an audio job has completed.
+        """
+        self.pending_jobs = max(self.pending_jobs - 1, 0)
+
+    @staticmethod
+    def parse_binary_frame(frame: bytes) -> Optional[Dict]:
+        """
+        Parse a binary audio frame into a message dict.
+
+        Frames start with a kind byte, the sample rate and the audio sequence
+        number, followed by little-endian 16-bit PCM samples, length-prefixed
+        Opus packets or an encoded screen image.
+
+        Args:
+            frame: Raw binary WebSocket frame
+
+        Returns:
+            Parsed message, or None if the frame is malformed
+        """
+        if len(frame) < FRAME_HEADER.size:
+            return None
+
+        kind, sample_rate, seq = FRAME_HEADER.unpack_from(frame)
+        payload = memoryview(frame)[FRAME_HEADER.size:]
+
+        if kind == FRAME_PCM16:
+            if len(payload) % 2:
+                return None
+            return {
+                "type": "audio_pcm",
+                "sampleRate": sample_rate,
+                "seq": seq,
+                "samples": np.frombuffer(payload, dtype="<i2"),
+            }
+        if kind == FRAME_OPUS:
+            return {
+                "type": "audio_opus",
+                "sampleRate": sample_rate,
+                "seq": seq,
+                "payload": bytes(payload),
+            }
+        if kind == FRAME_SCREEN:
+            return {
+                "type": "screen_frame",
+                "payload": bytes(payload),
+            }
+        return None
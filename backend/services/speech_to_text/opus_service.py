@@ -0,0 +1,202 @@
+import os
+import logging
+import struct
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class OpusStreamDecoder:
+    """
+    Incremental Opus decoder for a single audio stream.
+
+    Opus is stateful across packets, so one decoder is kept per client audio
+    stream and fed packets as they arrive. Decoding happens in-process with PyAV; no
+    temporary files are written and no process is spawned per chunk.
+    """
+
+    def __init__(self, codec_context, sample_rate: int):
+        """
+        Initialize the stream decoder.
+
+        Args:
+            codec_context: PyAV audio codec context opened for Opus decoding
+            sample_rate: Sample rate the client encoded at
+        """
+        self.codec_context = codec_context
+        self.sample_rate = sample_rate
+
+    def decode(self, packets: List[bytes]) -> Tuple[np.ndarray, int]:
+        """
+        Decode a batch of Opus packets into mono float32 samples.
+
+        Args:
+            packets: Raw Opus packets in stream order
+
+        Returns:
+            Tuple of (float32 samples in [-1, 1], sample rate of the samples)
+        """
+        import av
+
+        decoded = []
+        sample_rate = self.sample_rate
+        for packet_bytes in packets:
+            try:
+                frames = self.codec_context.decode(av.Packet(packet_bytes))
+            except av.AVError as e:
+                # A single corrupt packet should not kill the stream
+                logger.warning(f"Dropping undecodable Opus packet: {str(e)}")
+                continue
+
+            for frame in frames:
+                samples = frame.to_ndarray()
+                if samples.dtype == np.int16:
+                    samples = samples.astype(np.float32) / 32768.0
+                if frame.format.is_planar:
+                    # Planar layout is (channels, samples); keep the first channel
+                    samples = samples[0]
+                else:
+                    # Packed layout interleaves channels in a single row
+                    samples = samples.reshape(-1, len(frame.layout.channels))[:, 0]
+                decoded.append(samples.astype(np.float32, copy=False))
+                sample_rate = frame.sample_rate
+
+        if not decoded:
+            return np.zeros(0, dtype=np.float32), sample_rate
+        return np.concatenate(decoded), sample_rate
+
+    def close(self):
+        """
+        Release the codec context.
+        """
+        self.codec_context = None
+
+
+class OpusService:
+    """
+    Service for decoding the compressed (Opus) audio transport.
+
+    Clients encode audio with WebCodecs and send length-prefixed Opus packets
+    as binary WebSocket frames. PyAV is an optional dependency; when it is not
+    installed the server keeps negotiating the PCM transport.
+    """
+
+    def __init__(self):
+        """
+        Initialize the Opus service.
+        """
+        self.enabled = os.environ.get("OPUS_TRANSPORT_ENABLED", "true").lower() == "true"
+        self.available = False
+
+        if self.enabled:
+            try:
+                import av  # noqa: F401
+                self.available = True
+            except ImportError:
+                logger.warning("PyAV not installed. Opus audio transport will not be offered.")
+
+    def create_decoder(self, sample_rate: int) -> Optional[OpusStreamDecoder]:
+        """
+        Create a streaming decoder for one audio stream.
+
+        Args:
+            sample_rate: Sample rate the client encodes at
+
+        Returns:
+            A new stream decoder, or None if Opus decoding is unavailable
+        """
+        if not self.available:
+            return None
+
+        try:
+            import av
+            codec_context = av.CodecContext.create("opus", "r")
+            codec_context.sample_rate = sample_rate
+            codec_context.layout = "mono"
+            codec_context.open()
+            return OpusStreamDecoder(codec_context, sample_rate)
+        except Exception as e:
+            logger.error(f"Error creating Opus decoder: {str(e)}")
+            return None
+
+    def stream_decoder(self, session: Dict, stream_id: str, sample_rate: int,
+                       max_streams: int) -> Optional[OpusStreamDecoder]:
+        """
+        Get (or create) the decoder for one of a session's audio streams.
+
+        Each page load encodes its own Opus stream, so decoders are keyed by
+        stream ID like the sequence trackers; only the most recently used
+        streams are kept per session.
+
+        Args:
+            session: Session state holding the "opus_decoders" map
+            stream_id: Client-chosen ID of the audio stream
+            sample_rate: Sample rate the stream is encoded at
+            max_streams: Number of decoders to keep per session
+
+        Returns:
+            The stream's decoder, or None if Opus decoding is unavailable
+        """
+        decoders = session.setdefault("opus_decoders", OrderedDict())
+        decoder = decoders.get(stream_id)
+        if decoder is not None and decoder.sample_rate == sample_rate:
+            decoders.move_to_end(stream_id)
+            return decoder
+
+        # New stream, or the client renegotiated its encoder rate
+        self.drop_decoder(session, stream_id)
+        decoder = self.create_decoder(sample_rate)
+        if decoder is not None:
+            decoders[stream_id] = decoder
+            while len(decoders) > max_streams:
+                decoders.popitem(last=False)[1].close()
+        return decoder
+
+    def drop_decoder(self, session: Dict, stream_id: str):
+        """
+        Close and forget a stream's decoder, e.g. after a decode failure.
+
+        Args:
+            session: Session state holding the "opus_decoders" map
+            stream_id: Audio stream whose decoder to drop
+        """
+        decoder = session.get("opus_decoders", {}).pop(stream_id, None)
+        if decoder is not None:
+            decoder.close()
+
+    def close_decoders(self, session: Dict):
+        """
+        Close all of a session's stream decoders.
+
+        Args:
+            session: Session state holding the "opus_decoders" map
+        """
+        for decoder in session.pop("opus_decoders", {}).values():
+            decoder.close()
+
+    @staticmethod
+    def unpack_packets(payload: bytes) -> List[bytes]:
+        """
+        Split a payload of 2-byte big-endian length-prefixed packets.
+
+        Args:
+            payload: Concatenated length-prefixed Opus packets
+
+        Returns:
+            List of raw Opus packets
+        """
+        packets = []
+        offset = 0
+        while offset + 2 <= len(payload):
+            (length,) = struct.unpack_from(">H", payload, offset)
+            offset += 2
+            if offset + length > len(payload):
+                logger.warning("Truncated Opus packet in audio frame")
+                break
+            packets.append(payload[offset:offset + length])
+            offset += length
+        return packets
@@ -1,14 +1,39 @@
 import os
 import logging
 import numpy as np
-import tempfile
 import asyncio
-from typing import List, Optional
+from functools import lru_cache
+from typing import List, Optional, Union
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Sample rate expected by Whisper
+WHISPER_SAMPLE_RATE = 16000
+
+# Half-length of the anti-aliasing filter, in output samples
+RESAMPLE_FILTER_ZEROS = 16
+
+@lru_cache(maxsize=8)
+def _lowpass_taps(ratio: float) -> np.ndarray:
+    """
+    Build a Hann-windowed sinc low-pass filter for downsampling by `ratio`.
+    
+    Args:
+        ratio: Output rate divided by input rate (below 1)
+        
+    Returns:
+        Float32 filter taps with unit DC gain
+    """
+    # Cut off a little below the output Nyquist frequency so the transition
+    # band is attenuated too
+    cutoff = 0.5 * ratio * 0.9
+    half = int(np.ceil(RESAMPLE_FILTER_ZEROS / ratio))
+    n = np.arange(-half, half + 1)
+    taps = np.sinc(2 * cutoff * n) * np.hanning(len(n))
+    return (taps / taps.sum()).astype(np.float32)
+
 class WhisperService:
     """
     Service for speech-to-text conversion using OpenAI's Whisper model.
@@ -45,12 +70,12 @@ class WhisperService:
                 logger.error(f"Error initializing Whisper model: {str(e)}")
                 raise
     
-    async def process_audio(self, audio_data: List[int], sample_rate: int = 44100) -> Optional[str]:
+    async def process_audio(self, audio_data: Union[List[int], np.ndarray], sample_rate: int = 44100) -> Optional[str]:
         """
         Process audio data and convert to text.
         
         Args:
-            audio_data: List of audio samples (16-bit PCM)
+            audio_data: Audio samples, either 16-bit PCM integers or float32 in [-1, 1]
             sample_rate: Sample rate of the audio
             
         Returns:
@@ -61,35 +86,71 @@ class WhisperService:
             if not self.initialized:
                 await self.initialize()
             
-            # Convert audio data to numpy array
-            audio_np = np.array(audio_data, dtype=np.int16).astype(np.float32) / 32768.0
-            
-            # Save audio to temporary file
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=True) as temp_file:
-                import soundfile as sf
-                sf.write(temp_file.name, audio_np, sample_rate)
-                
-                # Run transcription in a separate thread to avoid blocking
-                loop = asyncio.get_event_loop()
-                result = await loop.run_in_executor(
-                    None, 
-                    lambda: self.model.transcribe(temp_file.name)
+            # Convert to float32 at Whisper's sample rate and transcribe in a
+            # separate thread to avoid blocking (filtering a chunk is not free)
+            loop = asyncio.get_event_loop()
+            result = await loop.run_in_executor(
+                None, 
+                lambda: self.model.transcribe(
+                    self._resample(self._to_float32(audio_data), sample_rate)
                 )
-                
-                # Extract text from result
-                transcription = result["text"].strip()
-                
-                if transcription:
-                    logger.info(f"Transcription successful: {transcription[:50]}...")
-                    return transcription
-                else:
-                    logger.warning("Transcription returned empty result")
-                    return None
+            )
+            
+            # Extract text from result
+            transcription = result["text"].strip()
+            
+            if transcription:
+                logger.info(f"Transcription successful: {transcription[:50]}...")
+                return transcription
+            else:
+                logger.warning("Transcription returned empty result")
+                return None
                 
         except Exception as e:
             logger.error(f"Error in speech-to-text processing: {str(e)}")
             return None
     
+    def _to_float32(self, audio_data: Union[List[int], np.ndarray]) -> np.ndarray:
+        """
+        Convert audio samples to float32 in [-1, 1].
+        
+        Args:
+            audio_data: Audio samples, either 16-bit PCM integers or floats
+            
+        Returns:
+            Float32 numpy array
+        """
+        if isinstance(audio_data, np.ndarray) and np.issubdtype(audio_data.dtype, np.floating):
+            return audio_data.astype(np.float32, copy=False)
+        return np.asarray(audio_data, dtype=np.int16).astype(np.float32) / 32768.0
+    
+    def _resample(self, audio_np: np.ndarray, sample_rate: int) -> np.ndarray:
+        """
+        Resample audio to Whisper's 16 kHz input rate.
+        
+        When downsampling, content above the new Nyquist frequency is removed
+        with a windowed-sinc low-pass filter first, so it does not alias into
+        the speech band; the filtered signal is then interpolated.
+        
+        Args:
+            audio_np: Float32 audio samples
+            sample_rate: Sample rate of the audio
+            
+        Returns:
+            Float32 audio samples at 16 kHz
+        """
+        if sample_rate == WHISPER_SAMPLE_RATE or len(audio_np) == 0:
+            return audio_np
+        
+        if sample_rate > WHISPER_SAMPLE_RATE:
+            taps = _lowpass_taps(WHISPER_SAMPLE_RATE / sample_rate)
+            audio_np = np.convolve(audio_np, taps, mode="same")
+        
+        target_length = int(round(len(audio_np) * WHISPER_SAMPLE_RATE / sample_rate))
+        source_positions = np.arange(len(audio_np), dtype=np.float64)
+        target_positions = np.linspace(0, len(audio_np) - 1, target_length)
+        return np.interp(target_positions, source_positions, audio_np).astype(np.float32)
+    
     def __del__(self):
         """
         Clean up resources when the service is destroyed.
@@ -0,0 +1,177 @@
+import os
+import io
+import logging
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, Dict, Optional, Set
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ScreenContextService:
+    """
+    Service for extracting visual context from shared-screen frames.
+
+    Clients send still frames as binary WebSocket frames. Frames that are
+    nearly identical to the last keyframe (by perceptual difference hash) are
+    dropped; OCR runs only on changed slides, in a worker pool, and the most
+    recent slide texts are fed into the AI prompt as context.
+
+    The stage is disabled unless SCREEN_CONTEXT_ENABLED is set and Pillow and
+    pytesseract are installed. While disabled, clients are told not to send
+    frames at all.
+    """
+
+    def __init__(self):
+        """
+        Initialize the screen context service.
+        """
+        self.enabled = os.environ.get("SCREEN_CONTEXT_ENABLED", "false").lower() == "true"
+        self.hash_threshold = int(os.environ.get("SCREEN_HASH_THRESHOLD", 6))
+        self.max_slides = int(os.environ.get("SCREEN_CONTEXT_SLIDES", 3))
+        self.max_context_chars = int(os.environ.get("SCREEN_CONTEXT_MAX_CHARS", 2000))
+        self.executor = None
+
+        if self.enabled:
+            try:
+                import PIL  # noqa: F401
+                import pytesseract  # noqa: F401
+                self.executor = ThreadPoolExecutor(
+                    max_workers=int(os.environ.get("SCREEN_OCR_WORKERS", 2)),
+                    thread_name_prefix="screen-ocr"
+                )
+            except ImportError:
+                logger.warning("Pillow/pytesseract not installed. Screen context stage disabled.")
+                self.enabled = False
+
+        # Per-session state: last keyframe hash, recent slide texts, in-flight sessions
+        self.last_hashes: Dict[str, int] = {}
+        self.slide_texts: Dict[str, Deque[str]] = {}
+        self.in_flight: Set[str] = set()
+
+    async def process_frame(self, session_id: str, frame: bytes) -> bool:
+        """
+        Process one screen frame for a session.
+
+        Args:
+            session_id: Session the frame belongs to
+            frame: Encoded still image (JPEG/PNG/WebP)
+
+        Returns:
+            True if the frame was a new keyframe and was sent to OCR, False otherwise
+        """
+        if not self.enabled:
+            return False
+
+        # Drop frames while the previous one is still being analysed
+        if session_id in self.in_flight:
+            return False
+
+        self.in_flight.add(session_id)
+        try:
+            loop = asyncio.get_event_loop()
+            frame_hash = await loop.run_in_executor(self.executor, self._dhash, frame)
+            if frame_hash is None:
+                return False
+
+            last_hash = self.last_hashes.get(session_id)
+            if last_hash is not None and bin(frame_hash ^ last_hash).count("1") <= self.hash_threshold:
+                return False
+            self.last_hashes[session_id] = frame_hash
+
+            text = await loop.run_in_executor(self.executor, self._ocr, frame)
+            if text:
+                slides = self.slide_texts.setdefault(session_id, deque(maxlen=self.max_slides))
+                slides.append(text)
+                logger.info(f"Extracted screen text for session {session_id}: {text[:50]}...")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error processing screen frame: {str(e)}")
+            return False
+        finally:
+            self.in_flight.discard(session_id)
+
+    def get_context(self, session_id: str) -> Optional[str]:
+        """
+        Get the recent on-screen text for a session.
+
+        Args:
+            session_id: Session to get context for
+
+        Returns:
+            Recent slide texts joined oldest-first, or None if there are none
+        """
+        slides = self.slide_texts.get(session_id)
+        if not slides:
+            return None
+        return "\n---\n".join(slides)[-self.max_context_chars:]
+
+    def drop_session(self, session_id: str):
+        """
+        Forget all visual context for a session.
+
+        Args:
+            session_id: Session to drop
+        """
+        self.last_hashes.pop(session_id, None)
+        self.slide_texts.pop(session_id, None)
+
+    @staticmethod
+    def _dhash(frame: bytes, hash_size: int = 8) -> Optional[int]:
+        """
+        Compute a 64-bit difference hash of an image.
+
+        Args:
+            frame: Encoded image bytes
+            hash_size: Hash width/height in bits
+
+        Returns:
+            The perceptual hash, or None if the image could not be decoded
+        """
+        from PIL import Image
+
+        try:
+            with Image.open(io.BytesIO(frame)) as image:
+                pixels = list(
+                    image.convert("L").resize((hash_size + 1, hash_size)).getdata()
+                )
+        except Exception as e:
+            logger.warning(f"Could not decode screen frame: {str(e)}")
+            return None
+
+        value = 0
+        for row in range(hash_size):
+            for col in range(hash_size):
+                left = pixels[row * (hash_size + 1) + col]
+                right = pixels[row * (hash_size + 1) + col + 1]
+                value = (value << 1) | (left > right)
+        return value
+
+    @staticmethod
+    def _ocr(frame: bytes) -> str:
+        """
+        Extract text from an image with Tesseract.
+
+        Args:
+            frame: Encoded image bytes
+
+        Returns:
+            Extracted text with blank lines collapsed
+        """
+        from PIL import Image
+        import pytesseract
+
+        with Image.open(io.BytesIO(frame)) as image:
+            text = pytesseract.image_to_string(image.convert("L"))
+        return "\n".join(line.strip() for line in text.splitlines() if line.strip())
+
+    def close(self):
+        """
+        Shut down the OCR worker pool.
+        """
+        if self.executor:
+            self.executor.shutdown(wait=False)
+            self.executor = None
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Import backend modules the way main.py does (e.g. `services.ai_processing...`)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -0,0 +1,25 @@
+import pytest
+
+from services.ai_processing.intent_service import (
+    INTENT_ACTION_ITEM,
+    INTENT_COMMENTARY,
+    INTENT_QUESTION,
+    IntentClassifierService,
+)
+
+
+@pytest.mark.parametrize("text, intent", [
+    ("What is the budget for Q3?", INTENT_QUESTION),
+    ("how do we roll this back", INTENT_QUESTION),
+    ("Does anyone know the deadline.", INTENT_QUESTION),
+    ("Can someone share the link.", INTENT_QUESTION),
+    ("I'll send the notes after the call.", INTENT_ACTION_ITEM),
+    ("We need to schedule a follow up with legal.", INTENT_ACTION_ITEM),
+    ("The deadline is next Friday.", INTENT_ACTION_ITEM),
+    ("Let's move on to the next slide.", INTENT_COMMENTARY),
+    ("I'll be honest, the numbers look good.", INTENT_COMMENTARY),
+    ("We'll see how it goes, the owner seemed happy.", INTENT_COMMENTARY),
+    ("Is it working. Yes it is.", INTENT_COMMENTARY),
+])
+def test_classify(text, intent):
+    assert IntentClassifierService().classify(text) == intent
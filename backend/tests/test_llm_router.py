@@ -0,0 +1,149 @@
+import asyncio
+import time
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from services.ai_processing.gemini_service import GeminiService
+from services.ai_processing.llm_router_service import LLMRouterService
+from services.ai_processing.ollama_service import OllamaService
+
+
+def gemini_app(calls, status=200):
+    """Stub of the Gemini generateContent API."""
+    async def generate(request):
+        calls.append(await request.json())
+        if status != 200:
+            return web.Response(status=status, text="stub error")
+        return web.json_response({
+            "candidates": [{"content": {"parts": [{"text": "gemini answer"}]}}]
+        })
+
+    app = web.Application()
+    app.router.add_post("/v1beta/models/gemini-pro:generateContent", generate)
+    return app
+
+
+def ollama_app(calls, status=200):
+    """Stub of the Ollama generate API."""
+    async def generate(request):
+        calls.append(await request.json())
+        if status != 200:
+            return web.Response(status=status, text="stub error")
+        return web.json_response({"response": "ollama answer", "done": True})
+
+    app = web.Application()
+    app.router.add_post("/api/generate", generate)
+    return app
+
+
+async def route(monkeypatch, gemini_status=200, ollama_status=200, ollama_down=False,
+                ollama_ms_per_kchar=None):
+    """Run one request through a router backed by stub servers."""
+    gemini_calls, ollama_calls = [], []
+    gemini_server = TestServer(gemini_app(gemini_calls, gemini_status))
+    ollama_server = TestServer(ollama_app(ollama_calls, ollama_status))
+    await gemini_server.start_server()
+    await ollama_server.start_server()
+
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setenv("GEMINI_API_URL", str(gemini_server.make_url("/v1beta/models/gemini-pro:generateContent")))
+    monkeypatch.setenv("OLLAMA_URL", str(ollama_server.make_url("")))
+    monkeypatch.setenv("OLLAMA_ENABLED", "true")
+    if ollama_ms_per_kchar is not None:
+        monkeypatch.setenv("OLLAMA_MS_PER_KCHAR", str(ollama_ms_per_kchar))
+
+    if ollama_down:
+        await ollama_server.close()
+
+    ollama, gemini = OllamaService(), GeminiService()
+    router = LLMRouterService([ollama, gemini])
+    try:
+        response = await router.generate_response("We should ship the release on Friday.")
+    finally:
+        await router.close()
+        await gemini_server.close()
+        if not ollama_down:
+            await ollama_server.close()
+
+    return response, router, ollama, gemini, ollama_calls, gemini_calls
+
+
+def test_routes_to_cheapest_backend_within_slo(monkeypatch):
+    response, router, _, _, ollama_calls, gemini_calls = asyncio.run(route(monkeypatch))
+
+    assert response == "ollama answer"
+    assert len(ollama_calls) == 1
+    assert ollama_calls[0]["stream"] is False
+    assert gemini_calls == []
+    assert router.failovers == 0
+
+
+def test_routes_to_faster_backend_when_cheap_one_misses_slo(monkeypatch):
+    response, _, _, _, ollama_calls, gemini_calls = asyncio.run(
+        route(monkeypatch, ollama_ms_per_kchar=100000)
+    )
+
+    assert response == "gemini answer"
+    assert ollama_calls == []
+    assert len(gemini_calls) == 1
+
+
+def test_fails_over_when_ollama_is_throttled(monkeypatch):
+    response, router, ollama, _, ollama_calls, gemini_calls = asyncio.run(
+        route(monkeypatch, ollama_status=503)
+    )
+
+    assert response == "gemini answer"
+    assert len(ollama_calls) == 1
+    assert len(gemini_calls) == 1
+    assert router.failovers == 1
+    assert ollama.throttles == 1
+    assert not ollama.is_healthy()
+
+
+def test_fails_over_when_gemini_is_rate_limited(monkeypatch):
+    response, router, _, gemini, ollama_calls, gemini_calls = asyncio.run(
+        route(monkeypatch, gemini_status=429, ollama_ms_per_kchar=100000)
+    )
+
+    assert response == "ollama answer"
+    assert len(gemini_calls) == 1
+    assert len(ollama_calls) == 1
+    assert router.failovers == 1
+    assert gemini.throttles == 1
+
+
+def test_fails_over_on_connection_error(monkeypatch):
+    response, router, ollama, _, _, gemini_calls = asyncio.run(
+        route(monkeypatch, ollama_down=True)
+    )
+
+    assert response == "gemini answer"
+    assert len(gemini_calls) == 1
+    assert router.failovers == 1
+    assert ollama.failures == 1
+
+
+def test_returns_none_when_every_backend_fails(monkeypatch):
+    response, router, _, _, ollama_calls, gemini_calls = asyncio.run(
+        route(monkeypatch, gemini_status=503, ollama_status=500)
+    )
+
+    assert response is None
+    assert len(ollama_calls) == 1
+    assert len(gemini_calls) == 1
+    assert router.exhausted == 1
+
+
+def test_slow_observation_decays_back_to_prior(monkeypatch):
+    monkeypatch.setenv("OLLAMA_MS_PER_KCHAR", "1500")
+    monkeypatch.setenv("LLM_ESTIMATE_HALF_LIFE_SECONDS", "60")
+    ollama = OllamaService()
+
+    # A cold model load: 40 s for a 1k-character prompt
+    ollama._record_latency(40000, 1000)
+    assert ollama.estimate_latency_ms(1000) > 3000
+
+    ollama.observed_at = time.monotonic() - 600
+    assert ollama.estimate_latency_ms(1000) < 1700
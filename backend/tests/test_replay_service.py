@@ -0,0 +1,84 @@
+from services.session.replay_service import ReplayService
+
+
+def test_each_chunk_is_processed_once():
+    replay, session = ReplayService(), {}
+
+    assert [replay.begin(session, "tab", seq) for seq in (1, 2, 2)] == [True, True, False]
+    replay.finish(session, "tab", 1)
+    replay.finish(session, "tab", 2)
+
+    assert replay.begin(session, "tab", 1) is False
+    assert replay.ack(session, "tab")["seq"] == 2
+
+
+def test_ack_waits_for_transcription_and_gaps():
+    replay, session = ReplayService(), {}
+    for seq in (1, 2, 3):
+        replay.begin(session, "tab", seq)
+
+    assert replay.finish(session, "tab", 2)["seq"] == 0
+    assert replay.finish(session, "tab", 1)["seq"] == 2
+    assert replay.ack(session, "tab")["seq"] == 2
+
+
+def test_aborted_chunk_is_accepted_again():
+    replay, session = ReplayService(), {}
+    replay.begin(session, "tab", 1)
+
+    retry = replay.abort(session, "tab", 1)
+
+    assert retry["type"] == "audio_retry" and retry["seq"] == 1
+    assert replay.ack(session, "tab")["seq"] == 0
+    assert replay.begin(session, "tab", 1) is True
+
+
+def test_new_stream_restarts_numbering():
+    replay, session = ReplayService(), {}
+    for seq in range(1, 6):
+        replay.begin(session, "before-reload", seq)
+        replay.finish(session, "before-reload", seq)
+
+    assert [replay.begin(session, "after-reload", seq) for seq in range(1, 6)] == [True] * 5
+
+
+def test_unfillable_gap_does_not_stall_ack(monkeypatch):
+    monkeypatch.setenv("REPLAY_SEQUENCE_WINDOW", "4")
+    replay, session = ReplayService(), {}
+    replay.begin(session, "tab", 1)
+    replay.finish(session, "tab", 1)
+
+    # Chunk 2 was lost for good; later chunks keep arriving
+    for seq in range(3, 9):
+        replay.begin(session, "tab", seq)
+        replay.finish(session, "tab", seq)
+
+    assert replay.ack(session, "tab")["seq"] == 8
+
+
+def test_expired_chunk_is_acked_not_retried():
+    replay, session = ReplayService(), {}
+    replay.begin(session, "tab", 1)
+
+    message = replay.expire(session, "tab", 1)
+
+    assert message == {"type": "audio_ack", "seq": 1}
+    assert replay.begin(session, "tab", 1) is False
+    assert replay.stats()["audio_expired"] == 1
+
+
+def test_retries_back_off_and_give_up(monkeypatch):
+    monkeypatch.setenv("REPLAY_RETRY_DELAY_MS", "100")
+    monkeypatch.setenv("REPLAY_MAX_RETRIES", "3")
+    replay, session = ReplayService(), {}
+
+    delays = []
+    for _ in range(3):
+        replay.begin(session, "tab", 1)
+        delays.append(replay.abort(session, "tab", 1)["retryAfterMs"])
+    replay.begin(session, "tab", 1)
+    final = replay.abort(session, "tab", 1)
+
+    assert delays == [100, 200, 400]
+    assert final == {"type": "audio_ack", "seq": 1}
+    assert replay.stats()["audio_dropped"] == 1
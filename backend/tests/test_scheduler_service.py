@@ -0,0 +1,102 @@
+import time
+import asyncio
+
+import pytest
+
+from services.scheduling.scheduler_service import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    FairSchedulerService,
+    JobExpiredError,
+)
+
+
+def record(order, name):
+    async def job():
+        order.append(name)
+        return name
+    return job
+
+
+async def hold_scheduler(scheduler):
+    """Occupy the scheduler's only slot until the returned event is set."""
+    release = asyncio.Event()
+    blocker = asyncio.create_task(scheduler.run("blocker", PRIORITY_INTERACTIVE, release.wait))
+    await asyncio.sleep(0)
+    return release, blocker
+
+
+def test_busy_tenant_does_not_starve_others():
+    async def scenario():
+        scheduler, order = FairSchedulerService("test", max_concurrency=1), []
+        release, blocker = await hold_scheduler(scheduler)
+
+        jobs = [
+            asyncio.create_task(scheduler.run(tenant, PRIORITY_INTERACTIVE, record(order, name)))
+            for tenant, name in (("a", "a1"), ("a", "a2"), ("a", "a3"), ("b", "b1"))
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(blocker, *jobs)
+        return order
+
+    assert asyncio.run(scenario()) == ["a1", "b1", "a2", "a3"]
+
+
+def test_interactive_jobs_run_before_background():
+    async def scenario():
+        scheduler, order = FairSchedulerService("test", max_concurrency=1), []
+        release, blocker = await hold_scheduler(scheduler)
+
+        jobs = [
+            asyncio.create_task(scheduler.run("a", PRIORITY_BACKGROUND, record(order, "summary"))),
+            asyncio.create_task(scheduler.run("b", PRIORITY_INTERACTIVE, record(order, "answer"))),
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(blocker, *jobs)
+        return order
+
+    assert asyncio.run(scenario()) == ["answer", "summary"]
+
+
+def test_tenant_quota_limits_concurrent_jobs():
+    async def scenario():
+        scheduler = FairSchedulerService("test", max_concurrency=4, tenant_quota=2)
+        peak = {}
+
+        def job(tenant):
+            async def run():
+                peak[tenant] = max(peak.get(tenant, 0), scheduler.tenant_running[tenant])
+                await asyncio.sleep(0.01)
+            return run
+
+        await asyncio.gather(*(
+            scheduler.run(tenant, PRIORITY_INTERACTIVE, job(tenant))
+            for tenant in ("a", "a", "a", "a", "b")
+        ))
+        return peak, scheduler
+
+    peak, scheduler = asyncio.run(scenario())
+    assert peak == {"a": 2, "b": 1}
+    assert scheduler.running == 0 and not scheduler.tasks
+
+
+def test_job_expires_if_deadline_passes_while_queued():
+    async def scenario():
+        scheduler, order = FairSchedulerService("test", max_concurrency=1), []
+        release, blocker = await hold_scheduler(scheduler)
+
+        stale = asyncio.create_task(scheduler.run(
+            "a", PRIORITY_INTERACTIVE, record(order, "stale"), deadline=time.monotonic() + 0.01
+        ))
+        await asyncio.sleep(0.02)
+        release.set()
+        await blocker
+        with pytest.raises(JobExpiredError):
+            await stale
+        return order, scheduler
+
+    order, scheduler = asyncio.run(scenario())
+    assert order == []
+    assert scheduler.stats()["classes"]["interactive"]["expired"] == 1
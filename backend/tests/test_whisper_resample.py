@@ -0,0 +1,29 @@
+import numpy as np
+
+from services.speech_to_text.whisper_service import WHISPER_SAMPLE_RATE, WhisperService
+
+
+def tone(frequency, sample_rate, seconds=1.0):
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    return (0.5 * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def rms(samples):
+    # Skip the filter's edge effects
+    middle = samples[len(samples) // 10: -len(samples) // 10]
+    return float(np.sqrt(np.mean(middle ** 2)))
+
+
+def test_resample_keeps_speech_band():
+    resampled = WhisperService()._resample(tone(1000, 48000), 48000)
+
+    assert len(resampled) == WHISPER_SAMPLE_RATE
+    assert resampled.dtype == np.float32
+    assert abs(rms(resampled) - rms(tone(1000, 48000))) < 0.02
+
+
+def test_resample_filters_content_above_nyquist():
+    # A 12 kHz tone would alias to 4 kHz at 16 kHz without a low-pass filter
+    resampled = WhisperService()._resample(tone(12000, 48000), 48000)
+
+    assert rms(resampled) < 0.01
@@ -2,6 +2,7 @@ import os
 import sys
 import uuid
 import json
+import struct
 import logging
 from datetime import datetime
 from typing import Dict
@@ -47,24 +48,93 @@ active_connections: Dict[str, WebSocket] = {}
 # Active sessions
 active_sessions: Dict[str, Dict] = {}
 
+# Binary frame header: kind, sample rate, audio sequence number (matches the
+# backend's capture service)
+FRAME_HEADER = struct.Struct(">BII")
+FRAME_OPUS = 0x01
+FRAME_PCM16 = 0x02
+
+# Fixed capture parameters; the mock server has no Opus decoder or OCR
+DEV_CAPTURE_PARAMS = {
+    "transport": "pcm",
+    "sampleRate": 16000,
+    "chunkDurationMs": 2000,
+    "screenCapture": False,
+    "screenIntervalMs": 5000,
+    "downsample": True,
+    "vad": True,
+}
+
+MOCK_RESPONSE = "This is a mock AI response for development. In production, this would be generated by Gemini API based on the audio transcript."
+
 # Routes
 @app.get("/", response_class=HTMLResponse)
 async def get_index(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
+async def send_mock_response(websocket: WebSocket, session_id: str):
+    """
+    Send a mock AI response in place of transcription and generation.
+    """
+    await websocket.send_json({
+        "type": "ai_response",
+        "responseId": str(uuid.uuid4()),
+        "response": MOCK_RESPONSE,
+        "timestamp": datetime.now().isoformat()
+    })
+    logger.info(f"Sent mock AI response for session: {session_id}")
+
+
+async def handle_binary_frame(websocket: WebSocket, session_id: str, stream_id: str, frame: bytes):
+    """
+    Ack binary audio frames and answer them with a mock AI response; ignore screen frames.
+    """
+    if len(frame) < FRAME_HEADER.size:
+        await websocket.send_json({"type": "error", "error": "Malformed binary frame"})
+        return
+    
+    kind, _, seq = FRAME_HEADER.unpack_from(frame)
+    session = active_sessions.get(session_id)
+    if kind not in (FRAME_OPUS, FRAME_PCM16) or not session or not session["is_capturing"]:
+        return
+    
+    if seq:
+        acks = session["audio_acks"]
+        if seq <= acks.get(stream_id, 0):
+            # Resent frame; just re-ack it
+            await websocket.send_json({"type": "audio_ack", "seq": acks[stream_id]})
+            return
+        acks[stream_id] = seq
+        await websocket.send_json({"type": "audio_ack", "seq": seq})
+    
+    await send_mock_response(websocket, session_id)
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
     session_id = None
+    stream_id = "default"
     
     try:
         while True:
-            # Receive message from client
-            data = await websocket.receive_json()
+            # Receive message from client (JSON text or binary audio/screen frame)
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            
+            if message.get("bytes") is not None:
+                await handle_binary_frame(websocket, session_id, stream_id, message["bytes"])
+                continue
+            
+            data = json.loads(message["text"])
             message_type = data.get("type")
             logger.info(f"Received message: {message_type}")
             
             # Handle different message types
+            if message_type in ("create_session", "reconnect_session"):
+                stream_id = data.get("streamId") or "default"
+            
             if message_type == "create_session":
                 # Create new session
                 session_id = str(uuid.uuid4())
@@ -73,12 +143,14 @@ async def websocket_endpoint(websocket: WebSocket):
                     "created_at": datetime.now(),
                     "settings": None,
                     "is_capturing": False,
+                    "audio_acks": {},
                 }
                 
                 # Send session ID back to client
                 await websocket.send_json({
                     "type": "session_created",
-                    "sessionId": session_id
+                    "sessionId": session_id,
+                    "captureParams": DEV_CAPTURE_PARAMS
                 })
                 logger.info(f"Created session: {session_id}")
                 
@@ -89,7 +161,9 @@ async def websocket_endpoint(websocket: WebSocket):
                     active_connections[session_id] = websocket
                     await websocket.send_json({
                         "type": "session_reconnected",
-                        "sessionId": session_id
+                        "sessionId": session_id,
+                        "captureParams": DEV_CAPTURE_PARAMS,
+                        "audioAck": active_sessions[session_id]["audio_acks"].get(data.get("streamId"), 0)
                     })
                     logger.info(f"Reconnected to session: {session_id}")
                 else:
@@ -100,11 +174,13 @@ async def websocket_endpoint(websocket: WebSocket):
                         "created_at": datetime.now(),
                         "settings": None,
                         "is_capturing": False,
+                        "audio_acks": {},
                     }
                     
                     await websocket.send_json({
                         "type": "session_created",
-                        "sessionId": session_id
+                        "sessionId": session_id,
+                        "captureParams": DEV_CAPTURE_PARAMS
                     })
                     logger.info(f"Created new session (reconnect failed): {session_id}")
             
@@ -143,12 +219,7 @@ async def websocket_endpoint(websocket: WebSocket):
                 
                 if session_id in active_sessions and active_sessions[session_id]["is_capturing"]:
                     # In development mode, we'll just send a mock AI response
-                    await websocket.send_json({
-                        "type": "ai_response",
-                        "response": "This is a mock AI response for development. In production, this would be generated by Gemini API based on the audio transcript.",
-                        "timestamp": datetime.now().isoformat()
-                    })
-                    logger.info(f"Sent mock AI response for session: {session_id}")
+                    await send_mock_response(websocket, session_id)
             
             elif message_type == "screen_capture":
                 # Process screen capture data (mock implementation)
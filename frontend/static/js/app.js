@@ -90,7 +90,8 @@ class MeetingAssistantApp {
         
         // Notify server that capture has started
         websocketService.sendMessage({
-            type: 'capture_started'
+            type: 'capture_started',
+            sampleRate: screenCaptureService.nativeSampleRate()
         });
     }
 
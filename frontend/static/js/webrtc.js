@@ -1,20 +1,88 @@
 /**
  * WebRTC functionality for screen and audio capture
  */
+
+// Binary frame kinds (must match the server's capture service)
+const FRAME_OPUS = 0x01;
+const FRAME_PCM16 = 0x02;
+const FRAME_SCREEN = 0x03;
+const FRAME_HEADER_SIZE = 9; // kind (1 byte) + sample rate (4 bytes) + sequence number (4 bytes), big-endian
+const FRAME_SEQ_OFFSET = 5;
+
+// Assumed native sample rate before the AudioContext exists (the common browser default)
+const DEFAULT_NATIVE_SAMPLE_RATE = 48000;
+
+// Sample rates the WebCodecs Opus encoder accepts
+const OPUS_SAMPLE_RATES = [48000, 24000, 16000, 12000, 8000];
+
 class ScreenCaptureService {
     constructor() {
         this.mediaStream = null;
         this.audioStream = null;
-        this.mediaRecorder = null;
+        this.frameCanvas = null;
         this.audioContext = null;
         this.audioProcessor = null;
         this.isCapturing = false;
-        this.chunks = [];
         this.audioChunks = [];
         this.screenPreview = document.getElementById('screenPreview');
         this.previewPlaceholder = document.getElementById('previewPlaceholder');
         this.captureInterval = null;
         this.audioSendInterval = null;
+        
+        // Capture parameters negotiated with the server (defaults until the session is created)
+        this.captureParams = {
+            transport: 'pcm',
+            sampleRate: 16000,
+            chunkDurationMs: 2000,
+            screenCapture: false,
+            screenIntervalMs: 5000,
+            downsample: false,
+            vad: false
+        };
+        this.vadThreshold = 0.01; // RMS below this is treated as silence
+        
+        // Opus encoder state (WebCodecs), used when the server negotiates the Opus transport
+        this.opusEncoder = null;
+        this.opusUnsupported = false;
+        this.opusPackets = [];
+        this.opusTimestamp = 0;
+    }
+
+    /**
+     * Get the sample rate captured audio will have before any downsampling
+     * @returns {number} Native sample rate in Hz
+     */
+    nativeSampleRate() {
+        return this.audioContext ? this.audioContext.sampleRate : DEFAULT_NATIVE_SAMPLE_RATE;
+    }
+
+    /**
+     * List the audio transports this browser can produce
+     * @returns {Array<string>} Supported transports, preferred first
+     */
+    supportedTransports() {
+        return 'AudioEncoder' in window ? ['opus', 'pcm'] : ['pcm'];
+    }
+
+    /**
+     * Apply capture parameters negotiated with the server
+     * @param {Object} params - Capture parameters from the server
+     */
+    applyCaptureParams(params) {
+        if (!params) return;
+        
+        const previous = this.captureParams;
+        this.captureParams = { ...this.captureParams, ...params };
+        
+        // Restart the send intervals if capture is running and the timing changed
+        if (this.isCapturing && (
+            previous.chunkDurationMs !== this.captureParams.chunkDurationMs ||
+            previous.screenIntervalMs !== this.captureParams.screenIntervalMs ||
+            previous.screenCapture !== this.captureParams.screenCapture
+        )) {
+            this.clearSendIntervals();
+            this.startSendIntervals();
+        }
     }
 
     /**
@@ -41,25 +109,12 @@ class ScreenCaptureService {
             this.screenPreview.style.display = 'block';
             this.previewPlaceholder.style.display = 'none';
 
-            // Setup media recorder for screen capture
-            this.mediaRecorder = new MediaRecorder(this.mediaStream, {
-                mimeType: 'video/webm;codecs=vp9'
-            });
+            // Setup canvas for grabbing still frames from the screen preview
+            this.frameCanvas = document.createElement('canvas');
 
             // Setup audio processing
             this.setupAudioProcessing();
 
-            // Event listeners for media recorder
-            this.mediaRecorder.ondataavailable = (event) => {
-                if (event.data.size > 0) {
-                    this.chunks.push(event.data);
-                }
-            };
-
-            this.mediaRecorder.onstop = () => {
-                this.stopCapture();
-            };
-
             // Handle stream ending (user clicks "Stop sharing")
             this.mediaStream.getVideoTracks()[0].onended = () => {
                 this.stopCapture();
@@ -97,27 +152,30 @@ class ScreenCaptureService {
      * Start capturing screen and audio
      */
     startCapture() {
-        if (!this.mediaRecorder) {
-            console.error('Media recorder not initialized');
+        if (!this.frameCanvas) {
+            console.error('Screen capture not initialized');
             return false;
         }
 
         this.isCapturing = true;
-        this.chunks = [];
         this.audioChunks = [];
         
-        // Start media recorder
-        this.mediaRecorder.start();
+        // Set up intervals to send screen captures and audio data
+        this.startSendIntervals();
         
-        // Set up interval to send screen captures
-        this.captureInterval = setInterval(() => {
-            this.mediaRecorder.requestData();
-            if (this.chunks.length > 0) {
-                const blob = new Blob(this.chunks, { type: 'video/webm' });
-                this.sendScreenCapture(blob);
-                this.chunks = [];
-            }
-        }, 5000); // Send every 5 seconds
+        return true;
+    }
+
+    /**
+     * Start the screen and audio send intervals using the negotiated timing
+     */
+    startSendIntervals() {
+        // Set up interval to send screen frames, only if the server processes them
+        if (this.captureParams.screenCapture) {
+            this.captureInterval = setInterval(() => {
+                this.sendScreenFrame();
+            }, this.captureParams.screenIntervalMs);
+        }
         
         // Set up interval to send audio data
         this.audioSendInterval = setInterval(() => {
@@ -125,9 +183,17 @@ class ScreenCaptureService {
                 this.sendAudioData(this.audioChunks);
                 this.audioChunks = [];
             }
-        }, 2000); // Send every 2 seconds
-        
-        return true;
+        }, this.captureParams.chunkDurationMs);
+    }
+
+    /**
+     * Stop the screen and audio send intervals
+     */
+    clearSendIntervals() {
+        clearInterval(this.captureInterval);
+        clearInterval(this.audioSendInterval);
+        this.captureInterval = null;
+        this.audioSendInterval = null;
     }
 
     /**
@@ -139,13 +205,7 @@ class ScreenCaptureService {
         this.isCapturing = false;
         
         // Stop intervals
-        clearInterval(this.captureInterval);
-        clearInterval(this.audioSendInterval);
-        
-        // Stop media recorder if it's active
-        if (this.mediaRecorder && this.mediaRecorder.state !== 'inactive') {
-            this.mediaRecorder.stop();
-        }
+        this.clearSendIntervals();
         
         // Stop all tracks
         if (this.mediaStream) {
@@ -167,6 +227,11 @@ class ScreenCaptureService {
             this.audioContext = null;
         }
         
+        if (this.opusEncoder) {
+            this.opusEncoder.encoder.close();
+            this.opusEncoder = null;
+        }
+        
         // Reset UI
         this.screenPreview.style.display = 'none';
         this.previewPlaceholder.style.display = 'flex';
@@ -174,20 +239,25 @@ class ScreenCaptureService {
     }
 
     /**
-     * Send screen capture data to the server
-     * @param {Blob} blob - Screen capture data
+     * Grab a still frame from the screen preview and send it as a binary frame
      */
-    sendScreenCapture(blob) {
-        // Convert blob to base64 and send via WebSocket
-        const reader = new FileReader();
-        reader.onloadend = () => {
-            const base64data = reader.result.split(',')[1];
-            websocketService.sendMessage({
-                type: 'screen_capture',
-                data: base64data
-            });
-        };
-        reader.readAsDataURL(blob);
+    sendScreenFrame() {
+        const video = this.screenPreview;
+        if (!video.videoWidth || !video.videoHeight) return;
+        
+        this.frameCanvas.width = video.videoWidth;
+        this.frameCanvas.height = video.videoHeight;
+        this.frameCanvas.getContext('2d').drawImage(video, 0, 0);
+        
+        this.frameCanvas.toBlob(async (blob) => {
+            if (!blob) return;
+            
+            const image = new Uint8Array(await blob.arrayBuffer());
+            const frame = new Uint8Array(FRAME_HEADER_SIZE + image.byteLength);
+            frame[0] = FRAME_SCREEN;
+            frame.set(image, FRAME_HEADER_SIZE);
+            websocketService.sendBinary(frame.buffer);
+        }, 'image/jpeg', 0.8);
     }
 
     /**
@@ -197,7 +267,7 @@ class ScreenCaptureService {
     sendAudioData(audioChunks) {
         // Concatenate audio chunks into a single Float32Array
         const totalLength = audioChunks.reduce((acc, chunk) => acc + chunk.length, 0);
-        const audioData = new Float32Array(totalLength);
+        let audioData = new Float32Array(totalLength);
         
         let offset = 0;
         for (const chunk of audioChunks) {
@@ -205,18 +275,196 @@ class ScreenCaptureService {
             offset += chunk.length;
         }
         
-        // Convert to 16-bit PCM
-        const pcmData = new Int16Array(audioData.length);
+        // Skip silent chunks entirely when the server asked for client-side VAD
+        if (this.captureParams.vad && !this.hasVoiceActivity(audioData)) {
+            return;
+        }
+        
+        // Downsample to the negotiated rate to cut bandwidth
+        let sampleRate = this.audioContext.sampleRate;
+        if (this.captureParams.downsample && sampleRate > this.captureParams.sampleRate) {
+            audioData = this.downsample(audioData, sampleRate, this.captureParams.sampleRate);
+            sampleRate = this.captureParams.sampleRate;
+        }
+        
+        // Use the compressed transport when negotiated
+        if (this.captureParams.transport === 'opus' && 'AudioEncoder' in window && !this.opusUnsupported) {
+            this.sendOpusAudio(audioData, sampleRate);
+            return;
+        }
+        
+        this.sendPcmAudio(audioData, sampleRate);
+    }
+
+    /**
+     * Send audio as 16-bit PCM in a binary frame
+     * @param {Float32Array} audioData - Mono audio samples in [-1, 1]
+     * @param {number} sampleRate - Sample rate of the audio
+     */
+    sendPcmAudio(audioData, sampleRate) {
+        // Convert to 16-bit PCM in a binary frame
+        const frame = new ArrayBuffer(FRAME_HEADER_SIZE + audioData.length * 2);
+        const view = new DataView(frame);
+        view.setUint8(0, FRAME_PCM16);
+        view.setUint32(1, sampleRate);
         for (let i = 0; i < audioData.length; i++) {
-            pcmData[i] = Math.max(-1, Math.min(1, audioData[i])) * 0x7FFF;
+            const sample = Math.max(-1, Math.min(1, audioData[i])) * 0x7FFF;
+            view.setInt16(FRAME_HEADER_SIZE + i * 2, sample, true);
+        }
+        
+        // Send audio data via WebSocket (numbered and kept until acked)
+        websocketService.sendAudioFrame(frame);
+    }
+
+    /**
+     * Encode audio with Opus and send the packets as one binary frame
+     * @param {Float32Array} audioData - Mono audio samples in [-1, 1]
+     * @param {number} sampleRate - Sample rate of the audio
+     */
+    async sendOpusAudio(audioData, sampleRate) {
+        // Opus only takes a few rates; bring anything else (e.g. a 44.1 kHz
+        // AudioContext) down to the nearest one below it
+        const opusRate = OPUS_SAMPLE_RATES.find((rate) => rate <= sampleRate);
+        if (!opusRate) {
+            this.sendPcmAudio(audioData, sampleRate);
+            return;
+        }
+        if (opusRate !== sampleRate) {
+            audioData = this.downsample(audioData, sampleRate, opusRate);
+            sampleRate = opusRate;
+        }
+        
+        if (!this.opusEncoder || this.opusEncoder.sampleRate !== sampleRate ||
+                this.opusEncoder.encoder.state === 'closed') {
+            if (!await this.createOpusEncoder(sampleRate)) {
+                // Fall back to PCM for the rest of the session
+                this.opusUnsupported = true;
+                this.sendPcmAudio(audioData, sampleRate);
+                return;
+            }
+        }
+        
+        this.opusEncoder.encoder.encode(new AudioData({
+            format: 'f32-planar',
+            sampleRate: sampleRate,
+            numberOfFrames: audioData.length,
+            numberOfChannels: 1,
+            timestamp: this.opusTimestamp,
+            data: audioData
+        }));
+        this.opusTimestamp += Math.round(audioData.length * 1e6 / sampleRate);
+        
+        try {
+            await this.opusEncoder.encoder.flush();
+        } catch (error) {
+            console.error('Error flushing Opus encoder:', error);
+            this.opusPackets = [];
+            this.sendPcmAudio(audioData, sampleRate);
+            return;
+        }
+        
+        // Pack as 2-byte big-endian length-prefixed packets
+        const packets = this.opusPackets;
+        this.opusPackets = [];
+        const payloadLength = packets.reduce((acc, packet) => acc + 2 + packet.byteLength, 0);
+        const frame = new Uint8Array(FRAME_HEADER_SIZE + payloadLength);
+        const view = new DataView(frame.buffer);
+        view.setUint8(0, FRAME_OPUS);
+        view.setUint32(1, sampleRate);
+        
+        let offset = FRAME_HEADER_SIZE;
+        for (const packet of packets) {
+            view.setUint16(offset, packet.byteLength);
+            frame.set(packet, offset + 2);
+            offset += 2 + packet.byteLength;
+        }
+        
+        websocketService.sendAudioFrame(frame.buffer);
+    }
+
+    /**
+     * Create a WebCodecs Opus encoder for the given sample rate
+     * @param {number} sampleRate - Sample rate of the audio to encode
+     * @returns {Promise<boolean>} False if the browser cannot encode this configuration
+     */
+    async createOpusEncoder(sampleRate) {
+        if (this.opusEncoder && this.opusEncoder.encoder.state !== 'closed') {
+            this.opusEncoder.encoder.close();
+        }
+        this.opusEncoder = null;
+        
+        const config = {
+            codec: 'opus',
+            sampleRate: sampleRate,
+            numberOfChannels: 1,
+            bitrate: 24000
+        };
+        try {
+            const support = await AudioEncoder.isConfigSupported(config);
+            if (!support.supported) {
+                console.warn(`Opus encoding at ${sampleRate} Hz is not supported, using PCM`);
+                return false;
+            }
+        } catch (error) {
+            console.error('Error checking Opus encoder support:', error);
+            return false;
         }
         
-        // Send audio data via WebSocket
-        websocketService.sendMessage({
-            type: 'audio_data',
-            data: Array.from(pcmData), // Convert to regular array for JSON serialization
-            sampleRate: this.audioContext.sampleRate
+        const encoder = new AudioEncoder({
+            output: (chunk) => {
+                const packet = new Uint8Array(chunk.byteLength);
+                chunk.copyTo(packet);
+                this.opusPackets.push(packet);
+            },
+            error: (error) => {
+                console.error('Opus encoder error:', error);
+            }
         });
+        encoder.configure(config);
+        
+        this.opusEncoder = { encoder, sampleRate };
+        this.opusPackets = [];
+        this.opusTimestamp = 0;
+        return true;
+    }
+
+    /**
+     * Check whether an audio buffer contains speech-level energy
+     * @param {Float32Array} audioData - Audio samples in [-1, 1]
+     * @returns {boolean} True if the RMS energy exceeds the VAD threshold
+     */
+    hasVoiceActivity(audioData) {
+        if (audioData.length === 0) return false;
+        
+        let sumSquares = 0;
+        for (let i = 0; i < audioData.length; i++) {
+            sumSquares += audioData[i] * audioData[i];
+        }
+        return Math.sqrt(sumSquares / audioData.length) >= this.vadThreshold;
+    }
+
+    /**
+     * Downsample audio by averaging the samples that fall into each output sample
+     * @param {Float32Array} audioData - Audio samples at the source rate
+     * @param {number} sourceRate - Source sample rate
+     * @param {number} targetRate - Target sample rate
+     * @returns {Float32Array} Audio samples at the target rate
+     */
+    downsample(audioData, sourceRate, targetRate) {
+        const ratio = sourceRate / targetRate;
+        const outputLength = Math.floor(audioData.length / ratio);
+        const output = new Float32Array(outputLength);
+        
+        for (let i = 0; i < outputLength; i++) {
+            const start = Math.floor(i * ratio);
+            const end = Math.min(Math.floor((i + 1) * ratio), audioData.length);
+            let sum = 0;
+            for (let j = start; j < end; j++) {
+                sum += audioData[j];
+            }
+            output[i] = end > start ? sum / (end - start) : 0;
+        }
+        return output;
     }
 }
 
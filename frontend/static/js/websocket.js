@@ -9,6 +9,26 @@ class WebSocketService {
         this.maxReconnectAttempts = 5;
         this.reconnectInterval = 3000; // 3 seconds
         this.sessionId = null;
+        
+        // Audio frames are numbered and kept until the server acks them, so
+        // frames sent while the connection is down are resent on reconnect.
+        // Numbering is scoped to this page's stream ID, so a reload or a second
+        // tab on the same session never collides with earlier sequence numbers
+        this.streamId = this.createStreamId();
+        this.audioSeq = 0;
+        this.resendBuffer = [];
+        this.maxResendFrames = 64;
+        
+        // Retries of frames the server turned away while overloaded back off
+        // and are capped, so clients do not pile resends onto a busy server
+        this.retryDelayMs = 2000;
+        this.maxAudioRetries = 4;
+        
+        // Responses already shown, so replayed or duplicate ones are skipped
+        this.lastResponseId = null;
+        this.seenResponseIds = new Set();
+        this.maxSeenResponseIds = 500;
+        
         this.connectionStatusElement = document.getElementById('connectionStatus');
         this.connectionStatusTextElement = document.getElementById('connectionStatusText');
     }
@@ -42,12 +62,21 @@ class WebSocketService {
         
         // Request a new session ID if we don't have one
         if (!this.sessionId) {
-            this.sendMessage({ type: 'create_session' });
+            this.sendMessage({
+                type: 'create_session',
+                streamId: this.streamId,
+                sampleRate: screenCaptureService.nativeSampleRate(),
+                transports: screenCaptureService.supportedTransports()
+            });
         } else {
             // Reconnect to existing session
             this.sendMessage({ 
                 type: 'reconnect_session',
-                sessionId: this.sessionId
+                sessionId: this.sessionId,
+                streamId: this.streamId,
+                lastResponseId: this.lastResponseId,
+                sampleRate: screenCaptureService.nativeSampleRate(),
+                transports: screenCaptureService.supportedTransports()
             });
         }
     }
@@ -62,12 +91,38 @@ class WebSocketService {
             
             switch (message.type) {
                 case 'session_created':
+                    // Sequence numbers are per session; frames buffered for an
+                    // expired session cannot be delivered
                     this.sessionId = message.sessionId;
+                    this.audioSeq = 0;
+                    this.resendBuffer = [];
+                    this.lastResponseId = null;
                     console.log('Session created:', this.sessionId);
                     // Store session ID in local storage for persistence
                     localStorage.setItem('meetingAssistantSessionId', this.sessionId);
+                    screenCaptureService.applyCaptureParams(message.captureParams);
+                    break;
+                    
+                case 'session_reconnected':
+                    screenCaptureService.applyCaptureParams(message.captureParams);
+                    this.acknowledgeAudio(message.audioAck);
+                    this.resendAudioFrames();
+                    break;
+                    
+                case 'capture_params':
+                    screenCaptureService.applyCaptureParams(message.captureParams);
+                    break;
+                    
+                case 'audio_ack':
+                    this.acknowledgeAudio(message.seq);
+                    break;
+                    
+                case 'audio_retry':
+                    // The server could not take this chunk yet (overloaded); try again later
+                    this.retryAudioFrame(message.seq, message.retryAfterMs);
                     break;
                     
+
                 case 'ai_response':
                     this.handleAIResponse(message);
                     break;
@@ -134,11 +189,118 @@ class WebSocketService {
         }
     }
 
+    /**
+     * Send a binary frame to the server
+     * @param {ArrayBuffer} buffer - Binary frame to send
+     */
+    sendBinary(buffer) {
+        if (!this.isConnected) {
+            console.error('Cannot send binary frame: WebSocket not connected');
+            return;
+        }
+        
+        try {
+            this.socket.send(buffer);
+        } catch (error) {
+            console.error('Error sending WebSocket binary frame:', error);
+        }
+    }
+
+    /**
+     * Create a random ID for this page's audio stream
+     * @returns {string} Stream ID
+     */
+    createStreamId() {
+        if (window.crypto && crypto.randomUUID) {
+            return crypto.randomUUID();
+        }
+        return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+    }
+
+    /**
+     * Number an audio frame, keep it for resending and send it if connected
+     * @param {ArrayBuffer} buffer - Binary audio frame with room for the sequence number
+     */
+    sendAudioFrame(buffer) {
+        const seq = ++this.audioSeq;
+        new DataView(buffer).setUint32(FRAME_SEQ_OFFSET, seq);
+        
+        // Bounded: when the connection stays down, the oldest audio is given up
+        this.resendBuffer.push({ seq, buffer, retries: 0 });
+        if (this.resendBuffer.length > this.maxResendFrames) {
+            this.resendBuffer.shift();
+        }
+        
+        if (this.isConnected && this.sessionId) {
+            this.sendBinary(buffer);
+        }
+    }
+
+    /**
+     * Drop buffered audio frames the server has acknowledged
+     * @param {number} seq - Highest sequence number received without gaps
+     */
+    acknowledgeAudio(seq) {
+        if (typeof seq !== 'number') return;
+        this.resendBuffer = this.resendBuffer.filter((frame) => frame.seq > seq);
+    }
+
+    /**
+     * Schedule the resend of a frame the server turned away, backing off
+     * exponentially and giving the frame up after maxAudioRetries attempts
+     * @param {number} seq - Sequence number of the frame
+     * @param {number} [retryAfterMs] - Delay suggested by the server
+     */
+    retryAudioFrame(seq, retryAfterMs) {
+        const frame = this.resendBuffer.find((buffered) => buffered.seq === seq);
+        if (!frame) return;
+        
+        if (frame.retries >= this.maxAudioRetries) {
+            console.warn(`Giving up on audio frame ${seq} after ${frame.retries} retries`);
+            this.resendBuffer = this.resendBuffer.filter((buffered) => buffered !== frame);
+            return;
+        }
+        
+        const delay = Math.max(retryAfterMs || 0, this.retryDelayMs * 2 ** frame.retries);
+        frame.retries++;
+        setTimeout(() => this.resendAudioFrame(seq), delay);
+    }
+
+    /**
+     * Resend one buffered audio frame, if it is still unacknowledged
+     * @param {number} seq - Sequence number of the frame
+     */
+    resendAudioFrame(seq) {
+        const frame = this.resendBuffer.find((buffered) => buffered.seq === seq);
+        if (frame && this.isConnected) {
+            this.sendBinary(frame.buffer);
+        }
+    }
+
+    /**
+     * Resend every unacknowledged audio frame (the server ignores duplicates)
+     */
+    resendAudioFrames() {
+        for (const frame of this.resendBuffer) {
+            this.sendBinary(frame.buffer);
+        }
+    }
+
     /**
      * Handle AI response from the server
      * @param {Object} message - AI response message
      */
     handleAIResponse(message) {
+        // Skip responses already shown (replays after a reconnect can overlap live ones)
+        if (message.responseId) {
+            if (this.seenResponseIds.has(message.responseId)) return;
+            this.seenResponseIds.add(message.responseId);
+            if (this.seenResponseIds.size > this.maxSeenResponseIds) {
+                this.seenResponseIds.delete(this.seenResponseIds.values().next().value);
+            }
+            this.lastResponseId = message.responseId;
+        }
+        
         const responseContainer = document.getElementById('responseContainer');
         
         // Remove empty state if present